@@ -1,6 +1,7 @@
-import mesa
+from core.base import Agent
+from core import phases
 
-class CentralBank(mesa.Agent):
+class CentralBank(Agent):
     """Центральный банк — агрегирует кредиты и депозиты."""
     def __init__(self, unique_id, model, initial_capital):
         super().__init__(unique_id, model)
@@ -13,9 +14,12 @@ class CentralBank(mesa.Agent):
         self.update_stats()
 
     def update_stats(self):
+        # Счета российских агентов, без счёта внешнего мира (ID=5)
         accounts = self.model.clearing_house.accounts
-        self.total_loans = sum(-b for b in accounts.values() if b < 0 and b != 5)
-        self.total_deposits = sum(b for b in accounts.values() if b > 0 and b != 5)
+        balances = [[b for aid, b in accounts.items() if aid != 5]]
+        loans, deposits = phases.bank_totals(balances)
+        self.total_loans = int(loans[0])
+        self.total_deposits = int(deposits[0])
         # Баланс банка должен быть равен капиталу, но может отличаться из-за кредитов.
         # Мы не храним активы банка как отдельный счёт, а просто вычисляем.
 
@@ -1,6 +1,7 @@
-import mesa
+from core.base import Agent
+from core import phases
 
-class ForeignSector(mesa.Agent):
+class ForeignSector(Agent):
     """Внешний мир — импорт и экспорт."""
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
@@ -11,12 +12,20 @@ class ForeignSector(mesa.Agent):
         total_export = self.model.config['foreign_trade']['total_export_value']
         export_share_s3 = self.model.config['foreign_trade']['export_sector_3_share']
         # Пока только сектор 3 (добыча)
-        firms_s3 = [f for f in self.model.firms if f.sector == 3]
-        if firms_s3:
-            # Распределяем экспорт между фирмами сектора 3 пропорционально размеру
-            sizes = [f.size for f in firms_s3]
-            amounts = proportional_split(round(total_export * export_share_s3), sizes)
-            for firm, amt in zip(firms_s3, amounts):
-                firm.receive_export(amt)
+        plan = self.model.allocation_plans.get('export_sector_3', self._export_plan)
+        if len(plan):
+            # Распределяем экспорт между фирмами сектора 3 пропорционально размеру, налог выделяется из суммы
+            net, tax = phases.export_revenue(plan, [total_export], [export_share_s3],
+                                             [self.model.config['tax']['rate']])
+            clearing_house = self.model.clearing_house
+            clearing_house.post([self.unique_id], [int(net.sum() + tax.sum())],
+                                plan.ids, net[0], tax=int(tax.sum()))
+            for firm, amount in zip(plan.agents, net[0].tolist()):
+                firm.revenue += amount
+                firm.balance = clearing_house.accounts.get(firm.unique_id, 0)
         # Импорт уже учтён при покупках домохозяйств и фирм
-        self.balance = self.model.clearing_house.accounts.get(self.unique_id, 0)
\ No newline at end of file
+        self.balance = self.model.clearing_house.accounts.get(self.unique_id, 0)
+
+    def _export_plan(self):
+        firms_s3 = [f for f in self.model.firms if f.sector == 3]
+        return firms_s3, [f.size for f in firms_s3]
\ No newline at end of file
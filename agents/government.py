@@ -1,7 +1,8 @@
-import mesa
+from core.base import Agent
+from core import phases
 from utils.rounding import proportional_split
 
-class TaxService(mesa.Agent):
+class TaxService(Agent):
     """Налоговая служба — аккумулирует налоги."""
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
@@ -17,7 +18,7 @@ class TaxService(mesa.Agent):
         self.tax_collected += amount
 
 
-class MinistryOfFinance(mesa.Agent):
+class MinistryOfFinance(Agent):
     """Министерство финансов — распределяет бюджет."""
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
@@ -41,34 +42,40 @@ class MinistryOfFinance(mesa.Agent):
 
         # Трансферты регионам
         # Веса регионов по населению
-        populations = [len(self.model.get_households_in_region(r.region_id)) for r in self.model.regions]
-        region_amounts = proportional_split(to_regions, populations)
-        for region, amount in zip(self.model.regions, region_amounts):
-            self.model.clearing_house.transfer(self.unique_id, region.unique_id, amount, is_taxable=False)
+        plans = self.model.allocation_plans
+        region_plan = plans.get('region_transfers', self._region_plan)
+        region_amounts = region_plan.split(to_regions)
+        for region, amount in zip(region_plan.agents, region_amounts):
+            self.model.clearing_house.transfer(self.unique_id, region.unique_id, int(amount), is_taxable=False)
 
         # Федеральные госзакупки
         if to_fed_proc > 0:
             # Выбираем фирмы пропорционально размеру
-            firms = self.model.firms
-            weights = [f.size for f in firms]
-            fed_proc_amounts = proportional_split(to_fed_proc, weights)
-            for firm, amount in zip(firms, fed_proc_amounts):
-                if amount > 0:
-                    # Государство покупает у фирмы (платит цену + налог)
-                    self.model.clearing_house.transfer(
-                        self.unique_id,
-                        firm.unique_id,
-                        amount,
-                        is_taxable=True,
-                        tax_rate=self.model.config['tax']['rate']
-                    )
+            fed_plan = plans.get('federal_procurement', self._federal_procurement_plan)
+            for firm, amount in fed_plan.pairs(to_fed_proc):
+                # Государство покупает у фирмы (платит цену + налог)
+                self.model.clearing_house.transfer(
+                    self.unique_id,
+                    firm.unique_id,
+                    amount,
+                    is_taxable=True,
+                    tax_rate=self.model.config['tax']['rate']
+                )
 
         # Резерв
         self.reserve_fund += reserve
         self.budget = 0
 
+    def _region_plan(self):
+        regions = self.model.regions
+        return regions, [len(self.model.get_households_in_region(r.unique_id)) for r in regions]
+
+    def _federal_procurement_plan(self):
+        firms = self.model.firms
+        return firms, [f.size for f in firms]
 
-class Region(mesa.Agent):
+
+class Region(Agent):
     """Регион (федеральный округ)."""
     def __init__(self, unique_id, model, config):
         super().__init__(unique_id, model)
@@ -121,32 +128,38 @@ class Region(mesa.Agent):
         """Региональные госзакупки."""
         if self.procurement_budget <= 0:
             return
-        firms = self.model.get_firms_in_region(self.unique_id)
-        if not firms:
+        plan = self.model.allocation_plans.get(('region_procurement', self.unique_id), self._procurement_plan)
+        if not len(plan):
             return
-        weights = [f.size for f in firms]
-        amounts = proportional_split(self.procurement_budget, weights)
-        for firm, amt in zip(firms, amounts):
-            if amt > 0:
-                self.model.clearing_house.transfer(
-                    self.unique_id,
-                    firm.unique_id,
-                    amt,
-                    is_taxable=True,
-                    tax_rate=self.model.config['tax']['rate']
-                )
+        for firm, amt in plan.pairs(self.procurement_budget):
+            self.model.clearing_house.transfer(
+                self.unique_id,
+                firm.unique_id,
+                amt,
+                is_taxable=True,
+                tax_rate=self.model.config['tax']['rate']
+            )
         self.procurement_budget = 0
 
+    def _procurement_plan(self):
+        firms = self.model.get_firms_in_region(self.unique_id)
+        return firms, [f.size for f in firms]
+
 
-class EmploymentExchange(mesa.Agent):
+class EmploymentExchange(Agent):
     """Биржа труда — выплачивает пособия безработным."""
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
         self.benefit_amount = model.config['social']['unemployment_benefit']
 
     def step(self):
+        # Увольнения и наймы за месяц
+        self.model.labor_market.step()
         # Выплата пособий безработным
-        unemployed = [hh for hh in self.model.households if hh.employer_id == self.unique_id]
-        for hh in unemployed:
-            self.model.clearing_house.transfer(self.unique_id, hh.unique_id, self.benefit_amount, is_taxable=False)
-            hh.income_transfer += self.benefit_amount
\ No newline at end of file
+        recipients, benefit = phases.unemployment_benefits(self.model.labor_market, [self.benefit_amount])
+        households = [self.model.households[h] for h in recipients.tolist()]
+        amount = int(benefit[0])
+        self.model.clearing_house.post([self.unique_id], [amount * len(households)],
+                                       [hh.unique_id for hh in households], [amount] * len(households))
+        for hh in households:
+            hh.income_transfer += amount
\ No newline at end of file
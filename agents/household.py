@@ -1,8 +1,7 @@
-import mesa
+from core.base import Agent
 import numpy as np
-from utils.rounding import proportional_split
 
-class Household(mesa.Agent):
+class Household(Agent):
     """Агент-домохозяйство."""
 
     def __init__(self, unique_id, model, params):
@@ -10,6 +9,7 @@ class Household(mesa.Agent):
         # Основные атрибуты
         self.region_id = params['region_id']
         self.employer_id = params['employer_id']  # ID фирмы или биржи труда
+        self.job_role = None  # director, manager, worker (назначает рынок труда)
         self.category = params.get('category', 'worker')  # worker, pensioner, disabled, veteran, child_family, unemployed
         self.age = params.get('age', 40)
         self.children = params.get('children', 0)
@@ -60,24 +60,20 @@ class Household(mesa.Agent):
             return
 
         # Получаем всех внутренних продавцов (фирмы + самозанятые)
-        sellers = self.model.get_all_domestic_sellers()
-        if not sellers:
+        plan = self.model.get_domestic_sellers_plan()
+        if not len(plan):
             return
 
         # Веса пропорциональны размеру (для фирм) или доходу (для самозанятых)
-        weights = [s.size for s in sellers]  # size определён у всех продавцов
         # Распределяем C_domestic пропорционально весам
-        amounts = proportional_split(C_domestic, weights)
-
-        for seller, amount in zip(sellers, amounts):
-            if amount > 0:
-                self.model.clearing_house.transfer(
-                    self.unique_id,
-                    seller.unique_id,
-                    amount,
-                    is_taxable=True,
-                    tax_rate=self.model.config['tax']['rate']
-                )
+        for seller, amount in plan.pairs(C_domestic):
+            self.model.clearing_house.transfer(
+                self.unique_id,
+                seller.unique_id,
+                amount,
+                is_taxable=True,
+                tax_rate=self.model.config['tax']['rate']
+            )
 
         # После покупок обнуляем доходы (для следующего месяца)
         self.income_labor = 0
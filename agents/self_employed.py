@@ -1,6 +1,6 @@
-import mesa
+from core.base import Agent
 
-class SelfEmployed(mesa.Agent):
+class SelfEmployed(Agent):
     """Агент-самозанятый. Упрощённо: один работник."""
     def __init__(self, unique_id, model, params):
         super().__init__(unique_id, model)
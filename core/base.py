@@ -0,0 +1,60 @@
+import random
+
+
+class Agent:
+    """
+    Базовый агент ядра модели.
+
+    Повторяет используемую часть API mesa.Agent 2.x (unique_id, model, step),
+    чтобы ядро запускалось без импорта mesa.
+    """
+
+    def __init__(self, unique_id, model):
+        self.unique_id = unique_id
+        self.model = model
+
+    def step(self):
+        pass
+
+
+class Model:
+    """Базовая модель: генератор случайных чисел и флаг работы."""
+
+    def __init__(self):
+        self.random = random.Random()
+        self.running = True
+
+
+class RandomActivation:
+    """
+    Расписание со случайным порядком активации агентов
+    (как mesa.time.RandomActivation: перемешивание model.random, затем step()).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.steps = 0
+        self.time = 0
+        # Список, а не словарь по unique_id: как и в mesa 2.x, уникальность ID не проверяется
+        self._agents = []
+
+    def add(self, agent):
+        self._agents.append(agent)
+
+    def remove(self, agent):
+        self._agents.remove(agent)
+
+    @property
+    def agents(self):
+        return list(self._agents)
+
+    def get_agent_count(self):
+        return len(self._agents)
+
+    def step(self):
+        agents = list(self._agents)
+        self.model.random.shuffle(agents)
+        for agent in agents:
+            agent.step()
+        self.steps += 1
+        self.time += 1
@@ -1,3 +1,4 @@
+import numpy as np
 from utils.rounding import proportional_split
 
 class ClearingHouse:
@@ -6,8 +7,12 @@ class ClearingHouse:
     def __init__(self, model):
         self.model = model
         self.accounts = {}  # agent_id -> balance
+        self.opening_total = 0  # сумма начальных остатков всех счетов
 
     def add_account(self, agent_id, initial_balance):
+        if agent_id in self.accounts:
+            raise ValueError(f"Счёт {agent_id} уже открыт: у каждого агента должен быть свой ID")
+        self.opening_total += initial_balance
         self.accounts[agent_id] = initial_balance
 
     def transfer(self, sender_id, recipient_id, amount, is_taxable=False, tax_rate=None):
@@ -36,16 +41,40 @@ class ClearingHouse:
 
         return True
 
+    def post(self, sender_ids, debits, recipient_ids, credits, tax=0):
+        """
+        Пакетная проводка: со счетов sender_ids списываются debits (с налогами),
+        на счета recipient_ids зачисляются credits, налог tax – на счёт налоговой
+        службы (ID=1), как в transfer. Эквивалентна набору переводов с теми же суммами;
+        если списания не равны зачислениям с налогом, проводка не выполняется.
+        """
+        debits = np.asarray(debits, dtype=np.int64).tolist()
+        credits = np.asarray(credits, dtype=np.int64).tolist()
+        if sum(debits) != sum(credits) + tax:
+            raise ValueError(f"Проводка не сбалансирована: списания {sum(debits)}, "
+                             f"зачисления {sum(credits)}, налог {tax}")
+        accounts = self.accounts
+        for agent_id, amount in zip(sender_ids, debits):
+            if amount:
+                accounts[agent_id] = accounts.get(agent_id, 0) - amount
+        for agent_id, amount in zip(recipient_ids, credits):
+            if amount:
+                accounts[agent_id] = accounts.get(agent_id, 0) + amount
+        if tax > 0:
+            accounts[1] = accounts.get(1, 0) + tax
+
     def check_invariant(self, model):
         """
         Проверяет балансовое тождество:
-        сумма всех российских счетов + счёт внешнего мира = капитал банка.
+        сумма всех российских счетов + счёт внешнего мира = капитал банка
+        + начальные остатки агентов (сбережения, балансы фирм).
+        Переводы только перемещают деньги между счетами, поэтому сумма не меняется.
         """
-        russian_ids = [aid for aid in self.accounts.keys() if aid not in [5]]  # 5 = foreign
-        total_russian = sum(self.accounts.get(aid, 0) for aid in russian_ids)
-        foreign_balance = self.accounts.get(5, 0)
-        total = total_russian + foreign_balance
+        # Российские счета и счёт внешнего мира (ID=5) вместе – это все счета
+        total = sum(self.accounts.values())
         capital = model.central_bank.capital
+        # Счёт банка (ID=4) открывается с капиталом, остальные – с начальными остатками агентов
+        deposits = self.opening_total - capital
         # Допуск в 1 рубль из-за округлений
-        if abs(total - capital) > 1:
-            raise ValueError(f"Балансовое тождество нарушено: total={total}, capital={capital}")
\ No newline at end of file
+        if abs(total - capital - deposits) > 1:
+            raise ValueError(f"Балансовое тождество нарушено: total={total}, capital={capital}, deposits={deposits}")
\ No newline at end of file
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class ConsumptionEngine:
+    """
+    Потребление всех домохозяйств за месяц с переиспользованием планов.
+
+    Суммы (C, импорт и налог с него, внутренние покупки) считаются векторно по доходам
+    и consumption_rate с теми же округлениями, что в Household.consume. Дорогая часть – разбиение
+    внутренних покупок по продавцам – хранится как суммарная выручка продавцов от
+    всех текущих планов: для домохозяйств, у которых сумма внутренних покупок
+    изменилась, старый вклад вычитается, новый добавляется (AllocationPlan.split_many).
+    Поэтому стоимость месяца пропорциональна числу домохозяйств, у которых изменилась
+    ситуация. Смена ставки налога, доли импорта или плана продавцов пересчитывает всех.
+    Результат по счетам совпадает с вызовом Household.consume() для каждого
+    домохозяйства (tests/test_consumption.py).
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._params = None  # (ставка налога, доля импорта, план продавцов)
+        self._domestic = None  # внутренние покупки текущих планов (0 – без покупок)
+        self._domestic_tax = None
+        self.receipts = None
+        self.import_total = 0
+        self.tax_total = 0
+        self.dirty_last_run = 0
+
+    def settle(self, incomes, rates, tax_rate, import_share, seller_plan):
+        """
+        Планы потребления за месяц по доходам и consumption_rate домохозяйств.
+
+        Возвращает (списания со счетов домохозяйств, маска домохозяйств, у которых
+        обнуляются доходы). Зачисления месяца – receipts (по продавцам seller_plan),
+        import_total (внешнему миру) и tax_total (налоговой службе).
+        """
+        incomes = np.asarray(incomes, dtype=np.int64)
+        rates = np.asarray(rates, dtype=float)
+        params = (tax_rate, import_share, seller_plan)
+        if params != self._params or len(self._domestic) != len(incomes):
+            self._params = params
+            self._domestic = np.zeros(len(incomes), dtype=np.int64)
+            self._domestic_tax = np.zeros(len(incomes), dtype=np.int64)
+            self.receipts = np.zeros(len(seller_plan), dtype=np.int64)
+
+        # Округления Household.consume: round() в Python – то же округление до чётного, что np.rint
+        C = np.rint(incomes * rates).astype(np.int64)
+        c_import = np.rint(C * import_share).astype(np.int64)
+        import_tax = np.where(c_import > 0, np.rint(c_import * tax_rate), 0).astype(np.int64)
+        c_domestic = C - c_import
+        buys = (C != 0) & (c_domestic > 0) & (len(seller_plan) > 0)
+        domestic = np.where(buys, c_domestic, 0)
+
+        changed = np.flatnonzero(domestic != self._domestic)
+        if len(changed):
+            old = self._domestic[changed]
+            new = domestic[changed]
+            removed, _ = seller_plan.split_many(old[old > 0])
+            added, taxes = seller_plan.split_many(new[new > 0], tax_rate)
+            self.receipts += added - removed
+            self._domestic_tax[changed] = 0
+            self._domestic_tax[changed[new > 0]] = taxes
+            self._domestic = domestic
+        self.dirty_last_run = len(changed)
+
+        self.import_total = int(c_import[c_import > 0].sum())
+        self.tax_total = int(import_tax.sum() + self._domestic_tax.sum())
+        debit = np.where(c_import > 0, c_import + import_tax, 0) + domestic + self._domestic_tax
+        return debit, buys
+
+    def run(self):
+        """Проводит месячное потребление домохозяйств модели по счетам клирингового центра."""
+        households = self.model.households
+        config = self.model.config
+        seller_plan = self.model.get_domestic_sellers_plan()
+        debit, buys = self.settle(
+            [hh.income_labor + hh.income_transfer for hh in households],
+            [hh.consumption_rate for hh in households],
+            config['tax']['rate'],
+            config['foreign_trade']['import_share_household'],
+            seller_plan,
+        )
+
+        # Покупки проводятся одним пакетом: импорт – внешнему миру (ID=5), выручка – продавцам
+        self.model.clearing_house.post(
+            [hh.unique_id for hh in households], debit,
+            [5] + seller_plan.ids, [self.import_total] + self.receipts.tolist(),
+            tax=self.tax_total,
+        )
+        # Как в Household.consume: доходы обнуляются после внутренних покупок
+        for i in np.flatnonzero(buys).tolist():
+            households[i].income_labor = 0
+            households[i].income_transfer = 0
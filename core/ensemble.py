@@ -0,0 +1,259 @@
+import copy
+import numpy as np
+from core import phases
+from core.consumption import ConsumptionEngine
+from core.model import EconomyModel
+from utils.metrics import declared_payroll, export_shares, monthly_metrics, save_metrics
+
+# Разделы конфигурации, которые влияют только на денежные потоки (не на популяцию)
+VARIANT_SECTIONS = ('tax', 'government', 'social', 'foreign_trade', 'bank')
+
+# Параметры этих разделов, которые читают фазы шага. Остальные (government.X/Y/Z,
+# категориальные выплаты) читаются только методами, которые EconomyModel.step не вызывает,
+# поэтому вариант с ними дал бы те же результаты, что и база
+VARIANT_PARAMS = {
+    'tax': ('rate', 'tax_wage'),
+    'social': ('unemployment_benefit',),
+    'foreign_trade': ('total_export_value', 'export_sector_3_share', 'import_share_household'),
+    'bank': ('initial_capital',),
+}
+
+
+def unsupported_overrides(overrides):
+    """Изменения из overrides (раздел или раздел.параметр), которые ансамбль не может учесть."""
+    bad = []
+    for section, values in overrides.items():
+        params = VARIANT_PARAMS.get(section)
+        if params is None or not isinstance(values, dict):
+            bad.append(section)
+        else:
+            bad.extend(f"{section}.{key}" for key in values if key not in params)
+    return bad
+
+
+def apply_overrides(config, overrides):
+    """Возвращает копию config с рекурсивно наложенными overrides."""
+    result = copy.deepcopy(config)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_overrides(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def variant_configs(config, variants):
+    """
+    Имена и эффективные конфигурации вариантов ансамбля.
+
+    Вариант – словарь изменений config (и необязательное имя 'name'); изменения,
+    которые ансамбль не может учесть, отклоняются с ValueError.
+    """
+    names, configs = [], []
+    for i, variant in enumerate(variants):
+        overrides = {k: v for k, v in variant.items() if k != 'name'}
+        bad = [k for k in overrides if k not in VARIANT_SECTIONS]
+        if bad:
+            raise ValueError(f"Вариант {i} меняет разделы {bad}, которые влияют на популяцию")
+        unread = unsupported_overrides(overrides)
+        if unread:
+            raise ValueError(f"Вариант {i} меняет параметры {unread}, которые не читает ни одна фаза шага")
+        names.append(variant.get('name', f"variant_{i}"))
+        configs.append(apply_overrides(config, overrides))
+    return names, configs
+
+
+def save_variant_metrics(names, data, path):
+    """Сохраняет метрики вариантов (списки строк по вариантам) в один CSV с колонкой variant."""
+    save_metrics([dict(variant=name, **row) for name, rows in zip(names, data) for row in rows], path)
+
+
+class EnsembleModel:
+    """
+    Ансамбль из K вариантов политики, идущих синхронно над одной популяцией.
+
+    Домохозяйства, фирмы и самозанятые создаются один раз (базовая EconomyModel),
+    а по вариантам расходятся только денежные величины: счета клирингового центра
+    (матрица K × счета), трансферты домохозяйств, выручка и балансы фирм, налоги.
+    Денежную арифметику фаз (зарплаты, пособия, экспорт, статистика банка) ансамбль
+    берёт из core.phases, потребление – из ConsumptionEngine.settle, метрики – из
+    utils.metrics.monthly_metrics: те же функции вызывают EconomyModel и агенты с K=1.
+    Ансамбль только проводит суммы по матрице счетов в порядке фаз EconomyModel.step.
+    Вариант k даёт те же метрики и остатки счетов, что отдельный прогон с его
+    конфигурацией (tests/test_ensemble.py).
+
+    Варианты могут менять только параметры VARIANT_PARAMS: разделы вне VARIANT_SECTIONS
+    влияют на популяцию, а остальные параметры не читает ни одна фаза шага.
+    """
+
+    def __init__(self, config, variants):
+        self.config = config
+        self.variant_names, self.variant_configs = variant_configs(config, variants)
+        self.K = len(self.variant_configs)
+        if self.K == 0:
+            raise ValueError("Ансамбль должен содержать хотя бы один вариант")
+
+        # Общая популяция (панель микроданных в ансамбле не пишется)
+        base_config = apply_overrides(config, {'panel': {'enabled': False}})
+        self.base = EconomyModel(base_config)
+        self.steps = 0
+        self.data = [[] for _ in range(self.K)]
+
+        self._init_params()
+        self._init_ledger()
+        self._init_agents()
+
+    def _param(self, section, key):
+        return np.array([c[section][key] for c in self.variant_configs])
+
+    def _init_params(self):
+        self.tax_rate = self._param('tax', 'rate').astype(float)
+        self.tax_wage = self._param('tax', 'tax_wage').astype(bool)
+        self.benefit = self._param('social', 'unemployment_benefit').astype(np.int64)
+        self.export_total = self._param('foreign_trade', 'total_export_value')
+        self.export_share_s3 = self._param('foreign_trade', 'export_sector_3_share')
+        self.import_share = self._param('foreign_trade', 'import_share_household').astype(float)
+        self.capital = self._param('bank', 'initial_capital').astype(np.int64)
+
+    def _init_ledger(self):
+        accounts = self.base.clearing_house.accounts
+        self.account_ids = [0] + [aid for aid in accounts if aid != 0]
+        self.col = {aid: i for i, aid in enumerate(self.account_ids)}
+        row = np.array([accounts.get(aid, 0) for aid in self.account_ids], dtype=np.int64)
+        self.ledger = np.tile(row, (self.K, 1))
+        # Начальный капитал банка зачисляется на его счёт (ID=4)
+        self.ledger[:, self.col[4]] = self.capital
+        # Начальные остатки остальных счетов общие для всех вариантов
+        self.deposits = self.base.clearing_house.opening_total - self.base.central_bank.capital
+        self.tax_collected = np.zeros(self.K, dtype=np.int64)
+
+    def _init_agents(self):
+        hh = self.base.households
+        firms = self.base.firms
+        self.hh_cols = np.array([self.col[h.unique_id] for h in hh], dtype=np.int64)
+        self.hh_savings = [h.savings for h in hh]
+        self.hh_rates = np.array([h.consumption_rate for h in hh], dtype=float)
+        # Доходы расходятся по вариантам: потребление обнуляет их только у тех, кто покупал
+        self.income_labor = np.tile(np.array([h.income_labor for h in hh], dtype=np.int64), (self.K, 1))
+        self.income_transfer = np.tile(np.array([h.income_transfer for h in hh], dtype=np.int64), (self.K, 1))
+
+        self.firm_cols = np.array([self.col[f.unique_id] for f in firms], dtype=np.int64)
+        self.firm_revenue = np.tile(np.array([f.revenue for f in firms], dtype=np.int64), (self.K, 1))
+        self.firm_balance = np.tile(np.array([f.balance for f in firms], dtype=np.int64), (self.K, 1))
+        self.firm_payroll = declared_payroll(firms)
+        self.export_shares = export_shares(firms)
+
+        # Экспортёры сектора 3 – тот же план распределения, что в ForeignSector.step
+        self.export_plan = self.base.allocation_plans.get('export_sector_3', self.base.foreign_sector._export_plan)
+        firm_pos = {f.unique_id: i for i, f in enumerate(firms)}
+        self.s3_pos = np.array([firm_pos[f.unique_id] for f in self.export_plan.agents], dtype=np.int64)
+
+        # Продавцы для потребления (фирмы и самозанятые)
+        self.seller_plan = self.base.get_domestic_sellers_plan()
+        self.seller_cols = np.array([self.col[sid] for sid in self.seller_plan.ids], dtype=np.int64)
+        self.consumption = [ConsumptionEngine(self.base) for _ in range(self.K)]
+
+        # Российские счета для статистики банка (как в CentralBank.update_stats)
+        self.domestic_cols = np.array([i for i, aid in enumerate(self.account_ids) if aid != 5], dtype=np.int64)
+
+    def _post(self, sender_cols, debits, recipient_cols, credits, tax=0):
+        """ClearingHouse.post для всех вариантов: суммы – K × счета (или общие для всех вариантов)."""
+        self.ledger[:, sender_cols] -= debits
+        self.ledger[:, recipient_cols] += credits
+        self.ledger[:, self.col[1]] += tax
+
+    # --- Фазы шага (арифметика – core.phases, как в EconomyModel) ---
+
+    def _pay_wages(self):
+        employed, wages, expenses, tax = phases.payroll(self.base.labor_market, self.tax_rate, self.tax_wage)
+        self._post(self.firm_cols, expenses, self.hh_cols[employed], wages, tax=tax.sum(axis=1))
+        self.income_labor[:, employed] += wages
+
+    def _pay_benefits(self):
+        """Наймы и увольнения (рынок труда общий для всех вариантов), затем пособия."""
+        market = self.base.labor_market
+        market.step()
+        recipients, benefit = phases.unemployment_benefits(market, self.benefit)
+        self._post([self.col[3]], len(recipients) * benefit[:, None], self.hh_cols[recipients], benefit[:, None])
+        self.income_transfer[:, recipients] += benefit[:, None]
+
+    def _export(self):
+        if not len(self.export_plan):
+            return
+        net, tax = phases.export_revenue(self.export_plan, self.export_total, self.export_share_s3, self.tax_rate)
+        s3_cols = self.firm_cols[self.s3_pos]
+        self._post([self.col[5]], (net + tax).sum(axis=1, keepdims=True), s3_cols, net, tax=tax.sum(axis=1))
+        self.firm_revenue[:, self.s3_pos] += net
+        self.firm_balance[:, self.s3_pos] = self.ledger[:, s3_cols]
+
+    def _forward_taxes(self):
+        """Накопленные налоги передаются в Минфин (TaxService.step)."""
+        self._post([self.col[1]], self.tax_collected[:, None], [self.col[2]], self.tax_collected[:, None])
+        self.tax_collected[:] = 0
+
+    def _consume(self):
+        debits, receipts = [], []
+        imports = np.zeros(self.K, dtype=np.int64)
+        taxes = np.zeros(self.K, dtype=np.int64)
+        for k, engine in enumerate(self.consumption):
+            debit, buys = engine.settle(self.income_labor[k] + self.income_transfer[k], self.hh_rates,
+                                        self.tax_rate[k], self.import_share[k], self.seller_plan)
+            debits.append(debit)
+            receipts.append(engine.receipts)
+            imports[k] = engine.import_total
+            taxes[k] = engine.tax_total
+            self.income_labor[k, buys] = 0
+            self.income_transfer[k, buys] = 0
+        # Как в ConsumptionEngine.run: импорт – внешнему миру (ID=5), выручка – продавцам
+        self._post(self.hh_cols, np.array(debits), np.concatenate([[self.col[5]], self.seller_cols]),
+                   np.column_stack([imports, np.array(receipts)]), tax=taxes)
+
+    def _check_invariant(self):
+        """Балансовое тождество ClearingHouse.check_invariant для каждого варианта."""
+        total = self.ledger.sum(axis=1)
+        bad = np.flatnonzero(np.abs(total - self.capital - self.deposits) > 1)
+        if len(bad):
+            k = int(bad[0])
+            raise ValueError(
+                f"Балансовое тождество нарушено в варианте {self.variant_names[k]}: "
+                f"total={total[k]}, capital={self.capital[k]}, deposits={self.deposits}"
+            )
+
+    def step(self):
+        """Один шаг (месяц) для всех вариантов сразу, в порядке фаз EconomyModel.step."""
+        self._pay_wages()
+        self._forward_taxes()
+        self._pay_benefits()
+        self._export()
+        self.steps += 1
+        # Метрики до потребления, которое обнуляет доходы
+        self._collect()
+        self._consume()
+        self._check_invariant()
+
+    # --- Метрики ---
+
+    def _collect(self):
+        loans, deposits = phases.bank_totals(self.ledger[:, self.domestic_cols])
+        rows = monthly_metrics(
+            self.steps,
+            income_labor=self.income_labor,
+            income_transfer=self.income_transfer,
+            savings=self.hh_savings,
+            unemployed=int(self.base.labor_market.on_exchange.sum()),
+            firm_revenue=self.firm_revenue,
+            firm_balance=self.firm_balance,
+            firm_payroll=self.firm_payroll,
+            export_share=self.export_shares,
+            tax_collected=self.tax_collected,
+            foreign_balance=self.ledger[:, self.col[5]],
+            capital=self.capital,
+            loans=loans,
+            deposits=deposits,
+        )
+        for data, row in zip(self.data, rows):
+            data.append(row)
+
+    def save(self, path):
+        """Сохраняет метрики всех вариантов в один CSV (колонка variant)."""
+        save_variant_metrics(self.variant_names, self.data, path)
@@ -0,0 +1,202 @@
+import math
+from statistics import NormalDist
+import numpy as np
+from core.model import EconomyModel
+from core.ensemble import EnsembleModel, apply_overrides, unsupported_overrides
+
+METHODS = ('independent', 'crn', 'antithetic', 'stratified')
+
+
+def _betainc(a, b, x):
+    """Регуляризованная неполная бета-функция I_x(a, b) (непрерывная дробь, метод Лентца)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        # Дробь быстро сходится только слева от моды
+        return 1.0 - _betainc(b, a, 1.0 - x)
+    tiny = 1e-300
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for num in (m * (b - m) * x / ((a + 2*m - 1) * (a + 2*m)),
+                    -(a + m) * (a + b + m) * x / ((a + 2*m) * (a + 2*m + 1))):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-15:
+            break
+    return front * h / a
+
+
+def t_cdf(t, df):
+    """Функция распределения Стьюдента с df степенями свободы (df может быть дробным)."""
+    tail = 0.5 * _betainc(df / 2, 0.5, df / (df + t * t))
+    return 1.0 - tail if t > 0 else tail
+
+
+def t_quantile(p, df):
+    """Квантиль распределения Стьюдента: обращение t_cdf бисекцией (точно и при малых df)."""
+    if df == math.inf:
+        return NormalDist().inv_cdf(p)
+    if p < 0.5:
+        return -t_quantile(1 - p, df)
+    lo, hi = 0.0, 1.0
+    while t_cdf(hi, df) < p:
+        lo, hi = hi, hi * 2
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if t_cdf(mid, df) < p:
+            lo = mid
+        else:
+            hi = mid
+        if hi - lo <= 1e-12 * hi:
+            break
+    return (lo + hi) / 2
+
+
+def _run_pair(config, treatment, steps, cache=None):
+    """Прогон базового и тестового варианта над одной популяцией; возвращает (метрики, метрики)."""
+    def run():
+        if not unsupported_overrides(treatment):
+            # Изменения только в денежных потоках, которые читают фазы ансамбля, – оба варианта синхронно
+            ensemble = EnsembleModel(config, [{'name': 'baseline'}, dict(treatment, name='treatment')])
+            for _ in range(steps):
+                ensemble.step()
+            return ensemble.data
+        return [_run_model(cfg, steps) for cfg in configs]
+
+    # Вариант ансамбля совпадает с отдельным прогоном, поэтому ключи кэша у обоих путей общие
+    configs = [config, apply_overrides(config, treatment)]
+    base, test = run() if cache is None else cache.get_or_run(configs, run)
+    return base, test
+
+
+def _run_single(config, steps, cache=None):
+    if cache is None:
+        return _run_model(config, steps)
+    return cache.get_or_run([config], lambda: [_run_model(config, steps)])[0]
+
+
+def _run_model(config, steps):
+    model = EconomyModel(config)
+    for _ in range(steps):
+        model.step()
+    return model.metrics.data
+
+
+def _summary(data, metric, statistic):
+    values = [row[metric] for row in data]
+    return values[-1] if statistic == 'last' else float(np.mean(values))
+
+
+def paired_comparison(config, treatment, replications=10, method='crn',
+                      metrics=('gini_income', 'unemployment'), statistic='last', confidence=0.95, cache=None):
+    """
+    Сравнение базового прогона и прогона с изменениями treatment.
+
+    method:
+        independent – у базы и теста разные seed (без снижения дисперсии); ошибка
+                      разности по Уэлчу, степени свободы по Саттертуэйту;
+        crn         – общие случайные числа: пара прогонов с одним seed;
+        antithetic  – пары реплик (u, 1 - u) с одним seed, наблюдение – среднее по паре;
+        stratified  – R реплик с одним seed, розыгрыши стратифицированы по репликам.
+    statistic: 'last' – значение метрики на последнем шаге, 'mean' – среднее по шагам.
+    cache: ResultCache – прогоны с уже посчитанными конфигурациями берутся из кэша.
+    Возвращает список словарей: средние по вариантам, средняя разность,
+    стандартная ошибка, степени свободы и доверительный интервал (квантиль
+    Стьюдента, точный и при малом числе наблюдений) для каждой метрики.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Неизвестный метод {method}, допустимы {METHODS}")
+    if method == 'antithetic' and replications % 2:
+        raise ValueError("Для antithetic нужно чётное число реплик")
+    seed = config['model'].get('seed', 42)
+    steps = config['model']['steps']
+    treatment_config = apply_overrides(config, treatment)
+
+    # Наблюдения: (база, тест) по метрикам
+    observations = []
+    if method == 'independent':
+        for r in range(replications):
+            base = _run_single(apply_overrides(config, {'model': {'seed': seed + 2*r}}), steps, cache)
+            test = _run_single(apply_overrides(treatment_config, {'model': {'seed': seed + 2*r + 1}}), steps, cache)
+            observations.append((base, test))
+    elif method == 'crn':
+        for r in range(replications):
+            cfg = apply_overrides(config, {'model': {'seed': seed + r}})
+            observations.append(_run_pair(cfg, treatment, steps, cache))
+    elif method == 'antithetic':
+        for r in range(replications // 2):
+            pair = []
+            for antithetic in (False, True):
+                cfg = apply_overrides(config, {'model': {'seed': seed + r}, 'random': {'antithetic': antithetic}})
+                pair.append(_run_pair(cfg, treatment, steps, cache))
+            observations.append(pair)
+    else:
+        for r in range(replications):
+            cfg = apply_overrides(config, {'random': {'stratum': [r, replications]}})
+            observations.append(_run_pair(cfg, treatment, steps, cache))
+
+    report = []
+    for metric in metrics:
+        if method == 'antithetic':
+            base = np.array([np.mean([_summary(b, metric, statistic) for b, _ in obs]) for obs in observations])
+            test = np.array([np.mean([_summary(t, metric, statistic) for _, t in obs]) for obs in observations])
+        else:
+            base = np.array([_summary(b, metric, statistic) for b, _ in observations])
+            test = np.array([_summary(t, metric, statistic) for _, t in observations])
+        diff = test - base
+        n = len(diff)
+        mean_diff = float(diff.mean())
+        if n > 1:
+            # Для independent разности не парные – дисперсии складываются (ошибка Уэлча,
+            # степени свободы по Саттертуэйту)
+            if method == 'independent':
+                v_base, v_test = base.var(ddof=1) / n, test.var(ddof=1) / n
+                std_err = math.sqrt(v_base + v_test)
+                denom = (v_base**2 + v_test**2) / (n - 1)
+                df = (v_base + v_test)**2 / denom if denom else n - 1
+            else:
+                std_err = float(diff.std(ddof=1) / math.sqrt(n))
+                df = n - 1
+            half_width = t_quantile((1 + confidence) / 2, df) * std_err
+            unpaired_var = base.var(ddof=1) + test.var(ddof=1)
+            diff_var = diff.var(ddof=1)
+        else:
+            std_err = half_width = df = math.nan
+            unpaired_var = diff_var = math.nan
+        report.append({
+            'metric': metric,
+            'method': method,
+            'observations': n,
+            'baseline_mean': float(base.mean()),
+            'treatment_mean': float(test.mean()),
+            'mean_diff': mean_diff,
+            'std_err': std_err,
+            'df': df,
+            'ci_low': mean_diff - half_width,
+            'ci_high': mean_diff + half_width,
+            'confidence': confidence,
+            # Во сколько раз дисперсия парной разности меньше, чем у независимых прогонов
+            'variance_reduction': unpaired_var / diff_var if diff_var else math.inf,
+        })
+    return report
+
+
+def format_report(report):
+    """Текстовая таблица парных разностей."""
+    lines = []
+    for row in report:
+        lines.append(
+            f"{row['metric']:>14}: Δ = {row['mean_diff']:.6g} "
+            f"[{row['ci_low']:.6g}; {row['ci_high']:.6g}] ({row['confidence']:.0%} ДИ), "
+            f"SE = {row['std_err']:.3g}, n = {row['observations']}, df = {row['df']:.3g}, "
+            f"снижение дисперсии ×{row['variance_reduction']:.3g}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,191 @@
+import numpy as np
+
+ROLES = ('director', 'manager', 'worker')
+EXCHANGE_ID = 3  # биржа труда
+JOB_SEEKER_CATEGORIES = ('worker', 'unemployed')
+
+
+class LaborMarket:
+    """
+    Рынок труда: привязка домохозяйств к рабочим местам фирм.
+
+    Состояние хранится в массивах: работодатель и роль каждого домохозяйства,
+    заполненность слотов (фирма × роль) и фактический фонд оплаты труда фирм.
+    Подбор выполняется сортировкой и сегментацией по регионам: внутри региона
+    вакансии упорядочены так, что фирмы заполняются равномерно (ключ – доля уже
+    занятых мест роли), затем старшие по возрасту соискатели получают места
+    директоров, следующие – менеджеров, остальные – рабочих. У домохозяйств нет
+    сектора, поэтому соответствия отрасли работника и фирмы нет: сектор фирмы
+    лишь разбивает ничьи ключа в порядке слотов.
+    Ежемесячные увольнения и наймы меняют только затронутые записи.
+    """
+
+    def __init__(self, model, config=None):
+        self.model = model
+        config = config or {}
+        self.separation_rate = config.get('separation_rate', 0.0)
+        self.hiring_rate = config.get('hiring_rate', 0.0)
+        self.rng = model.random_streams.stream('labor_market')
+
+        households = model.households
+        firms = model.firms
+        self.hh_region = np.array([hh.region_id for hh in households], dtype=np.int64)
+        self.hh_age = np.array([hh.age for hh in households], dtype=np.int64)
+        self.job_seeker = np.array([hh.category in JOB_SEEKER_CATEGORIES for hh in households], dtype=bool)
+        self.employer = np.full(len(households), -1, dtype=np.int64)  # индекс фирмы, -1 – нет
+        self.role = np.full(len(households), -1, dtype=np.int64)
+        self.on_exchange = np.array([hh.employer_id == EXCHANGE_ID for hh in households], dtype=bool)
+
+        self.firm_index = {f.unique_id: i for i, f in enumerate(firms)}
+        self.firm_region = np.array([f.region_id for f in firms], dtype=np.int64)
+        # Коды регионов 0..R-1 для сегментации
+        self.regions = np.unique(np.concatenate([self.hh_region, self.firm_region]))
+        self.hh_region_code = np.searchsorted(self.regions, self.hh_region)
+        self.firm_region_code = np.searchsorted(self.regions, self.firm_region)
+        self.firm_sector = np.array([f.sector for f in firms], dtype=np.int64)
+        self.capacity = np.array([[f.size_dir, f.size_men, f.size_worker] for f in firms],
+                                 dtype=np.int64).reshape(len(firms), 3)
+        self.wages = np.array([[f.wage_per_dir, f.wage_per_men, f.wage_per_worker] for f in firms],
+                              dtype=np.int64).reshape(len(firms), 3)
+        self.filled = np.zeros((len(firms), 3), dtype=np.int64)
+        self.payroll = np.zeros(len(firms), dtype=np.int64)
+        self.rosters = [set() for _ in firms]
+
+    # --- Подбор ---
+
+    def _vacancies(self, demand):
+        """
+        Разворачивает свободные места в массивы слотов (фирма, роль, ключ).
+
+        Ключ j-го свободного места пары (фирма, роль) – доля занятости после найма
+        (filled + j + 0.5) / capacity. demand – число соискателей по кодам регионов:
+        порог ключа подбирается бинарным поиском по региону, и разворачиваются только
+        слоты не выше порога (с запасом в один слот на пару), а не все вакансии.
+        """
+        cap = self.capacity.ravel()
+        filled = self.filled.ravel()
+        free = cap - filled
+        pair_code = np.repeat(self.firm_region_code, 3)
+        n_regions = len(self.regions)
+
+        def below(threshold, margin):
+            # Число свободных слотов пары с ключом <= threshold (± margin на погрешность)
+            count = np.floor(threshold[pair_code] * cap - filled + 0.5) + margin
+            return np.clip(count, 0, free).astype(np.int64)
+
+        lo = np.zeros(n_regions)
+        hi = np.ones(n_regions)
+        for _ in range(40):
+            mid = (lo + hi) / 2
+            enough = np.bincount(pair_code, weights=below(mid, -1), minlength=n_regions) >= demand
+            hi = np.where(enough, mid, hi)
+            lo = np.where(enough, lo, mid)
+        take = below(hi, 1)
+
+        pair = np.repeat(np.arange(take.size), take)
+        offset = np.arange(pair.size) - np.repeat(np.cumsum(take) - take, take)
+        firm, role = np.divmod(pair, 3)
+        key = (filled[pair] + offset + 0.5) / cap[pair]
+        return firm, role, key
+
+    def _match(self, seekers):
+        """Сопоставляет соискателей и вакансии внутри регионов; возвращает (домохозяйства, фирмы, роли)."""
+        empty = np.zeros(0, dtype=np.int64)
+        if len(seekers) == 0:
+            return empty, empty, empty
+        n_regions = len(self.regions)
+        seeker_code = self.hh_region_code[seekers]
+        n_seekers = np.bincount(seeker_code, minlength=n_regions)
+        slot_firm, slot_role, slot_key = self._vacancies(n_seekers)
+        slot_code = self.firm_region_code[slot_firm]
+
+        # Соискатели: по региону, старшие первыми
+        order = np.lexsort((seekers, -self.hh_age[seekers], seeker_code))
+        seekers, seeker_code = seekers[order], seeker_code[order]
+        # Слоты: по региону, затем по доле занятости роли (равномерно по фирмам); сектор – только ничьи
+        order = np.lexsort((slot_firm, self.firm_sector[slot_firm], slot_key, slot_code))
+        slot_firm, slot_role, slot_code = slot_firm[order], slot_role[order], slot_code[order]
+
+        n_slots = np.bincount(slot_code, minlength=n_regions)
+        matched = np.minimum(n_seekers, n_slots)
+        seeker_rank = np.arange(len(seekers)) - (np.cumsum(n_seekers) - n_seekers)[seeker_code]
+        slot_rank = np.arange(len(slot_firm)) - (np.cumsum(n_slots) - n_slots)[slot_code]
+        take_seekers = seeker_rank < matched[seeker_code]
+        take_slots = slot_rank < matched[slot_code]
+
+        # Выбранные слоты раздаём по ролям: директора первыми (старшим соискателям)
+        slot_firm, slot_role, slot_code = slot_firm[take_slots], slot_role[take_slots], slot_code[take_slots]
+        order = np.lexsort((slot_firm, slot_role, slot_code))
+        return seekers[take_seekers], slot_firm[order], slot_role[order]
+
+    def _hire(self, hh_idx, firm_idx, roles):
+        np.add.at(self.filled, (firm_idx, roles), 1)
+        np.add.at(self.payroll, firm_idx, self.wages[firm_idx, roles])
+        self.employer[hh_idx] = firm_idx
+        self.role[hh_idx] = roles
+        self.on_exchange[hh_idx] = False
+        households, firms = self.model.households, self.model.firms
+        for h, f, r in zip(hh_idx.tolist(), firm_idx.tolist(), roles.tolist()):
+            self.rosters[f].add(h)
+            households[h].employer_id = firms[f].unique_id
+            households[h].job_role = ROLES[r]
+
+    def _separate(self, hh_idx):
+        firm_idx, roles = self.employer[hh_idx], self.role[hh_idx]
+        np.subtract.at(self.filled, (firm_idx, roles), 1)
+        np.subtract.at(self.payroll, firm_idx, self.wages[firm_idx, roles])
+        self.employer[hh_idx] = -1
+        self.role[hh_idx] = -1
+        self.on_exchange[hh_idx] = True
+        households = self.model.households
+        for h, f in zip(hh_idx.tolist(), firm_idx.tolist()):
+            self.rosters[f].discard(h)
+            households[h].employer_id = EXCHANGE_ID
+            households[h].job_role = None
+
+    def match_initial(self):
+        """Начальная привязка: все домохозяйства категории worker на свободные места."""
+        seekers = np.flatnonzero(self.job_seeker & ~self.on_exchange & (self.employer < 0))
+        hh_idx, firm_idx, roles = self._match(seekers)
+        self._hire(hh_idx, firm_idx, roles)
+        # Не нашедшие места встают на учёт на бирже труда
+        unmatched = np.setdiff1d(seekers, hh_idx)
+        self.on_exchange[unmatched] = True
+        for h in unmatched.tolist():
+            self.model.households[h].employer_id = EXCHANGE_ID
+
+    def step(self):
+        """Ежемесячные увольнения и наймы."""
+        if self.separation_rate > 0:
+            employed = np.flatnonzero(self.employer >= 0)
+            leaving = employed[self.rng.uniform(len(employed)) < self.separation_rate]
+            if len(leaving):
+                self._separate(leaving)
+        if self.hiring_rate > 0:
+            pool = np.flatnonzero(self.on_exchange & self.job_seeker)
+            hires = pool[self.rng.uniform(len(pool)) < self.hiring_rate]
+            if len(hires):
+                hh_idx, firm_idx, roles = self._match(hires)
+                self._hire(hh_idx, firm_idx, roles)
+
+    # --- Запросы ---
+
+    def unemployed(self):
+        """Домохозяйства на учёте биржи труда."""
+        households = self.model.households
+        return [households[h] for h in np.flatnonzero(self.on_exchange)]
+
+    def workers_of(self, firm_id):
+        """Работники фирмы (в порядке создания домохозяйств)."""
+        households = self.model.households
+        return [households[h] for h in sorted(self.rosters[self.firm_index[firm_id]])]
+
+    def roster(self, firm_id):
+        """Пары (работник, зарплата по его роли)."""
+        f = self.firm_index[firm_id]
+        households = self.model.households
+        return [(households[h], int(self.wages[f, self.role[h]])) for h in sorted(self.rosters[f])]
+
+    def payroll_of(self, firm_id):
+        """Фактический месячный фонд оплаты труда фирмы."""
+        return int(self.payroll[self.firm_index[firm_id]])
@@ -1,5 +1,6 @@
-import mesa
+import time
 import numpy as np
+from core.base import Model
 from agents.household import Household
 from agents.firm import Firm
 from agents.self_employed import SelfEmployed
@@ -8,26 +9,66 @@ from agents.central_bank import CentralBank
 from agents.foreign_sector import ForeignSector
 from core.clearing_house import ClearingHouse
 from core.scheduler import CustomScheduler
+from core.labor_market import LaborMarket
+from core.consumption import ConsumptionEngine
+from core import phases
 from utils.distributions import generate_households, generate_firms, generate_self_employed
 from utils.metrics import MetricsCollector
+from utils.allocation import AllocationPlans
+from utils.rng import RandomStreams
 
-class EconomyModel(mesa.Model):
+class EconomyModel(Model):
     """Основной класс модели экономики."""
 
     def __init__(self, config):
         super().__init__()
         self.config = config
         self.schedule = CustomScheduler(self)
+        # Время этапов инициализации, сек (для --profile-startup)
+        self.setup_times = {}
+        t0 = time.perf_counter()
+
+        # Потоки случайных чисел по компонентам (общие случайные числа для парных прогонов)
+        self.random_streams = RandomStreams(config['model'].get('seed', 42), config.get('random'))
 
         # Инициализация клирингового центра (синглтон)
         self.clearing_house = ClearingHouse(self)
 
+        # Кэш планов распределения по неизменным весам (сбрасывается при изменении агентов)
+        self.allocation_plans = AllocationPlans(self)
+
         # Создание агентов
         self._create_agents()
+        t1 = time.perf_counter()
+        self.setup_times['agents'] = t1 - t0
+
+        # Рынок труда: привязка работников к фирмам
+        self.labor_market = LaborMarket(self, config.get('labor_market'))
+        self.labor_market.match_initial()
+        t2 = time.perf_counter()
+        self.setup_times['labor_market'] = t2 - t1
+
+        # Потребление домохозяйств с переиспользованием неизменившихся планов
+        self.consumption = ConsumptionEngine(self)
 
         # Инициализация сборщика метрик
         self.metrics = MetricsCollector(self)
 
+        # Панель микроданных по агентам (опционально)
+        self.panel = None
+        panel_cfg = config.get('panel') or {}
+        if panel_cfg.get('enabled'):
+            from utils.panel import PanelWriter
+            self.panel = PanelWriter(
+                self,
+                panel_cfg.get('path', 'panel'),
+                every=panel_cfg.get('every', 1),
+                chunk_steps=panel_cfg.get('chunk_steps', 12),
+                compress=panel_cfg.get('compress', False),
+            )
+
+        self.setup_times['other'] = time.perf_counter() - t2
+
         # Установка seed для воспроизводимости
         np.random.seed(config['model']['seed'])
         self.random = np.random
@@ -62,25 +103,26 @@ class EconomyModel(mesa.Model):
             self.regions.append(region)
             self.clearing_house.add_account(region_id, 0)
 
-        # 7. Домохозяйства
+        # 7. Домохозяйства (ID = 1000..), за ними подряд фирмы и самозанятые: у каждого агента свой счёт
         self.households = []
-        hh_data = generate_households(self.config['households'], self)
+        hh_data = generate_households(self.config['households'], self, first_id=1000)
         for hh in hh_data:
-            self.clearing_house.add_account(hh.household_id, hh.savings)
+            self.clearing_house.add_account(hh.unique_id, hh.savings)
             self.households.append(hh)
 
         # 8. Фирмы
         self.firms = []
-        firm_data = generate_firms(self.config['firms'], self)
+        firm_data = generate_firms(self.config['firms'], self, first_id=1000 + len(self.households))
         for f in firm_data:
-            self.clearing_house.add_account(f.firm_id, f.balance)
+            self.clearing_house.add_account(f.unique_id, f.balance)
             self.firms.append(f)
 
         # 9. Самозанятые
         self.self_employed = []
-        se_data = generate_self_employed(self.config['self_employed'], self)
+        se_data = generate_self_employed(self.config['self_employed'], self,
+                                         first_id=1000 + len(self.households) + len(self.firms))
         for se in se_data:
-            self.clearing_house.add_account(se.agent_id, se.savings)
+            self.clearing_house.add_account(se.unique_id, se.savings)
             self.self_employed.append(se)
 
         # Добавление всех агентов в расписание
@@ -96,17 +138,42 @@ class EconomyModel(mesa.Model):
 
     def step(self):
         """Один шаг симуляции (1 месяц)."""
+        # Зарплата выплачивается в начале месяца, затем шаги агентов
+        self.pay_wages()
         self.schedule.step()
-        self.clearing_house.check_invariant(self)
+        # Метрики и панель фиксируют доходы месяца до того, как потребление их обнулит
         self.metrics.collect(self.schedule.steps)
+        if self.panel is not None:
+            self.panel.record(self.schedule.steps)
+        # Потребление домохозяйств – последняя фаза месяца
+        self.consumption.run()
+        self.clearing_house.check_invariant(self)
+
+    def pay_wages(self):
+        """Фаза выплаты зарплат: фирмы платят занятым по их ролям, налог на ФОТ – при tax_wage."""
+        tax = self.config['tax']
+        employed, wages, expenses, wage_tax = phases.payroll(self.labor_market, [tax['rate']], [tax['tax_wage']])
+        households = self.households
+        self.clearing_house.post([f.unique_id for f in self.firms], expenses[0],
+                                 [households[h].unique_id for h in employed.tolist()], wages,
+                                 tax=int(wage_tax.sum()))
+        for h, wage in zip(employed.tolist(), wages.tolist()):
+            households[h].income_labor += wage
 
     def get_all_domestic_sellers(self):
         """Возвращает список всех внутренних продавцов (фирмы + самозанятые)."""
         return self.firms + self.self_employed
 
+    def get_domestic_sellers_plan(self):
+        """План распределения покупок между внутренними продавцами (веса – size)."""
+        def build():
+            sellers = self.get_all_domestic_sellers()
+            return sellers, [s.size for s in sellers]
+        return self.allocation_plans.get('domestic_sellers', build)
+
     def get_workers_of_firm(self, firm_id):
         """Возвращает список домохозяйств, работающих в данной фирме."""
-        return [hh for hh in self.households if hh.employer_id == firm_id]
+        return self.labor_market.workers_of(firm_id)
 
     def get_households_in_region(self, region_id):
         return [hh for hh in self.households if hh.region_id == region_id]
@@ -0,0 +1,49 @@
+"""
+Денежная арифметика фаз месяца для K вариантов параметров.
+
+Функции получают параметры политики массивами длины K и возвращают суммы с первой
+осью – вариантом. EconomyModel вызывает их с K=1 и проводит суммы через
+ClearingHouse.post, EnsembleModel – для всех вариантов по матрице счетов.
+"""
+import numpy as np
+
+
+def payroll(market, tax_rate, tax_wage):
+    """
+    Зарплата занятым по их ролям и налог на фонд оплаты труда (при tax_wage).
+
+    Возвращает (индексы занятых домохозяйств, их зарплаты, расходы фирм K × фирмы,
+    налог K × фирмы). Зарплаты от варианта не зависят.
+    """
+    employed = np.flatnonzero(market.employer >= 0)
+    wages = market.wages[market.employer[employed], market.role[employed]]
+    tax_rate = np.asarray(tax_rate, dtype=float)[:, None]
+    tax = np.where(np.asarray(tax_wage, dtype=bool)[:, None], np.rint(market.payroll * tax_rate), 0).astype(np.int64)
+    return employed, wages, market.payroll + tax, tax
+
+
+def unemployment_benefits(market, benefit):
+    """Пособия безработным: (индексы домохозяйств на учёте биржи, пособие по вариантам)."""
+    return np.flatnonzero(market.on_exchange), np.asarray(benefit, dtype=np.int64)
+
+
+def export_revenue(plan, total_export, export_share_s3, tax_rate):
+    """
+    Экспортная выручка фирм сектора 3 по плану plan (веса – размер фирм).
+
+    Приходящая сумма включает налог round(amount * rate / (1 + rate)).
+    Возвращает (выручка без налога, налог), обе K × фирмы плана.
+    """
+    gross = np.array([plan.split(round(total * share)) for total, share in zip(total_export, export_share_s3)],
+                     dtype=np.int64).reshape(len(total_export), len(plan))
+    rate = np.asarray(tax_rate, dtype=float)[:, None]
+    tax = np.rint(gross * rate / (1 + rate)).astype(np.int64)
+    return gross - tax, tax
+
+
+def bank_totals(balances):
+    """Кредиты и депозиты банка по остаткам российских счетов (K × счета): (кредиты K, депозиты K)."""
+    balances = np.asarray(balances, dtype=np.int64)
+    loans = -np.where(balances < 0, balances, 0).sum(axis=1)
+    deposits = np.where(balances > 0, balances, 0).sum(axis=1)
+    return loans, deposits
@@ -1,6 +1,6 @@
-import mesa
+from core.base import RandomActivation
 
-class CustomScheduler(mesa.time.RandomActivation):
+class CustomScheduler(RandomActivation):
     """Кастомное расписание, если потребуется особая логика порядка шагов."""
     def __init__(self, model):
         super().__init__(model)
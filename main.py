@@ -1,38 +1,189 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import time
+_START = time.perf_counter()
+
 import argparse
-import yaml
 import random
-import numpy as np
-from core.model import EconomyModel
+import sys
+
+# Тяжёлые модули (ядро модели, numpy) импортируются внутри функций, после разбора аргументов
+OPTIONAL_MODULES = ('mesa', 'streamlit', 'networkx', 'pandas')
+
+def load_yaml(path):
+    import yaml
+    # C-реализация загрузчика (libyaml), если доступна, иначе чистый Python
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=loader)
+
+def print_startup_profile(timings, model=None):
+    """Отчёт о времени запуска: импорты, инициализация, первый шаг."""
+    print("Профиль запуска:")
+    for name, seconds in timings.items():
+        print(f"  {name:<28} {seconds * 1000:9.1f} мс")
+        if name == 'создание модели' and model is not None:
+            for phase, phase_seconds in model.setup_times.items():
+                print(f"    {phase:<26} {phase_seconds * 1000:9.1f} мс")
+    print(f"  {'итого с запуска main.py':<28} {(time.perf_counter() - _START) * 1000:9.1f} мс")
+    loaded = [m for m in OPTIONAL_MODULES if m in sys.modules]
+    print(f"  необязательные модули загружены: {', '.join(loaded) if loaded else 'нет'}")
+
+def open_cache(cache_dir, cache_max_mb=None):
+    """Кэш результатов в cache_dir с лимитом cache_max_mb МБ (None – без ограничения)."""
+    from utils.result_cache import ResultCache
+    max_size = None if cache_max_mb is None else int(cache_max_mb * 2**20)
+    return ResultCache(cache_dir, max_size=max_size)
+
+def main(config_path, output_path, cache_dir=None, cache_max_mb=None, cache_checkpoint=False, panel_path=None,
+         profile_startup=False):
+    timings = {'разбор аргументов': time.perf_counter() - _START}
 
-def main(config_path, output_path):
     # Загрузка конфигурации
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    t = time.perf_counter()
+    config = load_yaml(config_path)
+    timings['загрузка конфигурации'] = time.perf_counter() - t
+    if panel_path:
+        config['panel'] = dict(config.get('panel') or {}, enabled=True, path=panel_path)
 
     # Установка seed
+    t = time.perf_counter()
+    import numpy as np
+    timings['импорт numpy'] = time.perf_counter() - t
     seed = config['model'].get('seed', 42)
     random.seed(seed)
     np.random.seed(seed)
 
+    # Кэш результатов: одинаковые (конфигурация, seed, версия кода) не пересчитываются
+    # (панель микроданных пишется только при реальном прогоне, поэтому с ней кэш не читаем)
+    cache = None
+    panel_enabled = (config.get('panel') or {}).get('enabled', False)
+    if cache_dir and not panel_enabled:
+        cache = open_cache(cache_dir, cache_max_mb)
+        key = cache.key_for(config)
+        data = cache.get(key)
+        if data is not None:
+            from utils.metrics import save_metrics
+            save_metrics(data, output_path)
+            print(f"Результаты взяты из кэша ({key[:12]}) и сохранены в {output_path}")
+            if profile_startup:
+                print_startup_profile(timings)
+            return
+
+    t = time.perf_counter()
+    from core.model import EconomyModel
+    timings['импорт ядра модели'] = time.perf_counter() - t
+
     # Создание модели
+    t = time.perf_counter()
     model = EconomyModel(config)
+    timings['создание модели'] = time.perf_counter() - t
 
     # Запуск симуляции
+    if profile_startup and config['model']['steps'] == 0:
+        print_startup_profile(timings, model)
     for step in range(config['model']['steps']):
-        model.step()
+        t = time.perf_counter()
+        try:
+            model.step()
+        finally:
+            # Профиль печатается и тогда, когда первый шаг завершился исключением
+            if step == 0:
+                timings['первый шаг'] = time.perf_counter() - t
+                if profile_startup:
+                    print_startup_profile(timings, model)
         if step % 12 == 0:
             print(f"Шаг {step+1}/{config['model']['steps']} завершён")
 
+    if model.panel is not None:
+        model.panel.close()
+        print(f"Панель микроданных сохранена в {model.panel.path}")
+
     # Сохранение результатов
     model.metrics.save(output_path)
     print(f"Результаты сохранены в {output_path}")
 
+    if cache is not None:
+        checkpoint = dict(model.clearing_house.accounts) if cache_checkpoint else None
+        cache.put(key, model.metrics.data, checkpoint=checkpoint)
+
+def run_ensemble(config_path, variants_path, output_path, cache_dir=None, cache_max_mb=None):
+    """Прогон K вариантов политики синхронно над одной популяцией."""
+    import numpy as np
+    from core.ensemble import EnsembleModel, save_variant_metrics, variant_configs
+
+    config = load_yaml(config_path)
+    variants = load_yaml(variants_path)
+    if isinstance(variants, dict):
+        variants = variants['variants']
+
+    seed = config['model'].get('seed', 42)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    def run():
+        ensemble = EnsembleModel(config, variants)
+        for step in range(config['model']['steps']):
+            ensemble.step()
+            if step % 12 == 0:
+                print(f"Шаг {step+1}/{config['model']['steps']} завершён ({ensemble.K} вариантов)")
+        return ensemble.data
+
+    # Вариант ансамбля даёт те же метрики, что отдельный прогон с его конфигурацией,
+    # поэтому в кэше он лежит под тем же ключом
+    names, configs = variant_configs(config, variants)
+    data = run() if cache_dir is None else open_cache(cache_dir, cache_max_mb).get_or_run(configs, run)
+    save_variant_metrics(names, data, output_path)
+    print(f"Результаты ансамбля сохранены в {output_path}")
+
+def run_comparison(config_path, treatment_path, output_path, replications, method, metrics, statistic,
+                   cache_dir=None, cache_max_mb=None):
+    """Парное сравнение базового варианта и изменений из treatment_path."""
+    from core.experiments import paired_comparison, format_report
+    from utils.metrics import save_metrics
+
+    config = load_yaml(config_path)
+    treatment = load_yaml(treatment_path)
+    # Как и в main: с панелью микроданных прогоны выполняются заново
+    panel_enabled = (config.get('panel') or {}).get('enabled', False)
+    cache = open_cache(cache_dir, cache_max_mb) if cache_dir and not panel_enabled else None
+
+    report = paired_comparison(config, treatment, replications=replications, method=method,
+                               metrics=metrics, statistic=statistic, cache=cache)
+    print(format_report(report))
+    save_metrics(report, output_path)
+    print(f"Отчёт сравнения сохранён в {output_path}")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--config', type=str, default='config.yaml', help='Путь к файлу конфигурации')
     parser.add_argument('--output', type=str, default='results.csv', help='Путь для сохранения результатов')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Каталог кэша результатов (по умолчанию кэш выключен)')
+    parser.add_argument('--cache-max-mb', type=float, default=None, help='Максимальный размер кэша в МБ (LRU-вытеснение)')
+    parser.add_argument('--cache-checkpoint', action='store_true', help='Сохранять в кэш итоговые остатки счетов')
+    parser.add_argument('--panel', type=str, default=None, help='Каталог для панели микроданных по агентам')
+    parser.add_argument('--variants', type=str, default=None, help='YAML со списком вариантов политики для ансамблевого прогона')
+    parser.add_argument('--compare', type=str, default=None, help='YAML с изменениями конфигурации для парного сравнения с базой')
+    parser.add_argument('--replications', type=int, default=10, help='Число реплик для --compare')
+    parser.add_argument('--vr-method', type=str, default='crn', choices=['independent', 'crn', 'antithetic', 'stratified'],
+                        help='Метод снижения дисперсии для --compare')
+    parser.add_argument('--metrics', type=str, default='gini_income,unemployment', help='Метрики для --compare через запятую')
+    parser.add_argument('--statistic', type=str, default='last', choices=['last', 'mean'],
+                        help='Сводка метрики по прогону: последний шаг или среднее')
+    parser.add_argument('--cache-stats', action='store_true', help='Вывести статистику кэша и выйти')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Вывести время импортов, инициализации модели и первого шага')
     args = parser.parse_args()
-    main(args.config, args.output)
\ No newline at end of file
+    if args.cache_stats:
+        if not args.cache_dir:
+            parser.error('--cache-stats требует --cache-dir')
+        print(open_cache(args.cache_dir, args.cache_max_mb).format_stats())
+    elif args.compare:
+        run_comparison(args.config, args.compare, args.output, args.replications, args.vr_method,
+                       args.metrics.split(','), args.statistic, args.cache_dir, args.cache_max_mb)
+    elif args.variants:
+        run_ensemble(args.config, args.variants, args.output, args.cache_dir, args.cache_max_mb)
+    else:
+        main(args.config, args.output, args.cache_dir, args.cache_max_mb, args.cache_checkpoint, args.panel,
+             args.profile_startup)
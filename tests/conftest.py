@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def small_config():
+    """Конфигурация по умолчанию с уменьшенной популяцией (быстрые прогоны)."""
+    with open(os.path.join(ROOT, 'config.yaml.txt'), encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    config['model']['steps'] = 4
+    config['households']['count'] = 2000
+    config['firms']['count'] = 200
+    config['self_employed']['count'] = 200
+    config['panel']['enabled'] = False
+    return config
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from core.model import EconomyModel
+from utils.allocation import AllocationPlan
+from utils.rounding import proportional_split
+
+
+class _Agent:
+    def __init__(self, unique_id):
+        self.unique_id = unique_id
+
+
+@pytest.mark.parametrize('weights', [
+    [1],
+    [3, 3, 3],                       # ничьи по остатку – меньший индекс первым
+    [0, 5, 0, 2],                    # нулевые веса
+    [0, 0],
+    [7, 1, 13, 2, 2, 5, 1, 1, 30, 4],
+    np.random.default_rng(11).integers(0, 50, 400).tolist(),
+    np.random.default_rng(12).integers(1, 10**6, 50).tolist(),
+])
+def test_split_matches_proportional_split(weights):
+    plan = AllocationPlan([_Agent(i) for i in range(len(weights))], weights)
+    rng = np.random.default_rng(len(weights))
+    totals = [0, 1, 2, len(weights), -17, 10**9 + 7] + rng.integers(0, 10**7, 50).tolist()
+    for total in totals:
+        assert plan.split(total).tolist() == proportional_split(total, weights), total
+
+
+def test_model_plans_match_proportional_split(small_config):
+    model = EconomyModel(small_config)
+    sellers = model.get_all_domestic_sellers()
+    plan = model.get_domestic_sellers_plan()
+    assert plan is model.get_domestic_sellers_plan()  # план строится один раз
+    weights = [s.size for s in sellers]
+    for total in (0, 1, 999, 123456789):
+        assert plan.split(total).tolist() == proportional_split(total, weights)
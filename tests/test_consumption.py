@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from core.model import EconomyModel
+from utils.allocation import AllocationPlan
+
+
+def _small(config):
+    config['households']['count'] = 600
+    config['firms']['count'] = 60
+    config['self_employed']['count'] = 60
+    return config
+
+
+def _month(model, engine):
+    model.pay_wages()
+    model.schedule.step()
+    if engine:
+        model.consumption.run()
+    else:
+        for hh in model.households:
+            hh.consume()
+
+
+def test_engine_matches_household_consume(small_config):
+    """ConsumptionEngine.run() проводит по счетам то же, что Household.consume() каждого домохозяйства."""
+    config = _small(small_config)
+    fast, slow = EconomyModel(config), EconomyModel(config)
+    for month in range(4):
+        if month == 2:
+            # Изменившиеся планы: часть домохозяйств меняет долю потребления
+            for model in (fast, slow):
+                for hh in model.households[::7]:
+                    hh.consumption_rate = min(1.2, hh.consumption_rate + 0.1)
+        if month == 3:
+            # Смена ставки налога пересчитывает все планы
+            for model in (fast, slow):
+                model.config['tax']['rate'] = 0.2
+        _month(fast, engine=True)
+        _month(slow, engine=False)
+        assert fast.clearing_house.accounts == slow.clearing_house.accounts, month
+        assert ([(h.income_labor, h.income_transfer) for h in fast.households]
+                == [(h.income_labor, h.income_transfer) for h in slow.households]), month
+    assert 0 < fast.consumption.dirty_last_run
+
+
+class _Agent:
+    def __init__(self, unique_id):
+        self.unique_id = unique_id
+
+
+@pytest.mark.parametrize('weights, high', [
+    # Повторяющиеся веса (группы) и суммы, дающие ничьи на границе остатка
+    ([1, 2, 2, 3, 1, 2, 5, 1, 3, 2], 1000),
+    # Сотни групп разного размера и крупные суммы – как у внутренних продавцов модели
+    (np.maximum(1, np.random.default_rng(3).lognormal(2, 1, 600)).astype(int).tolist() + [1] * 300, 10**6),
+])
+def test_split_many_matches_split(weights, high):
+    rng = np.random.default_rng(7)
+    plan = AllocationPlan([_Agent(i) for i in range(len(weights))], weights)
+    totals = np.concatenate([rng.integers(0, high, 300), np.arange(0, 40)])
+    amounts, taxes = plan.split_many(totals, tax_rate=0.13)
+    expected = [plan.split(int(total)) for total in totals]
+    assert amounts.tolist() == np.sum(expected, axis=0).tolist()
+    assert taxes.tolist() == [int(np.rint(e * 0.13).sum()) for e in expected]
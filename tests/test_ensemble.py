@@ -0,0 +1,62 @@
+import pytest
+
+from core.ensemble import EnsembleModel, apply_overrides, unsupported_overrides
+from core.model import EconomyModel
+
+
+def test_unsupported_overrides():
+    assert unsupported_overrides({'tax': {'rate': 0.12}, 'bank': {'initial_capital': 1}}) == []
+    assert unsupported_overrides({'tax': {'rate': 0.12, 'tax_hh_to_hh': True}}) == ['tax.tax_hh_to_hh']
+    assert unsupported_overrides({'government': {'X': 0.5}}) == ['government']
+    assert unsupported_overrides({'households': {'count': 10}}) == ['households']
+
+
+@pytest.mark.parametrize('override', [
+    {'government': {'X': 0.5, 'Y': 0.4}},
+    {'social': {'veteran_allowance': 9000}},
+])
+def test_rejects_overrides_no_phase_reads(small_config, override):
+    with pytest.raises(ValueError, match='не читает'):
+        EnsembleModel(small_config, [{'name': 'base'}, dict(override, name='variant')])
+
+
+def test_rejects_population_sections(small_config):
+    with pytest.raises(ValueError, match='популяцию'):
+        EnsembleModel(small_config, [{'name': 'base'}, {'name': 'big', 'households': {'count': 10}}])
+
+
+VARIANTS = [
+    {'name': 'base'},
+    {'name': 'tax', 'tax': {'rate': 0.15}},
+    {'name': 'tax_wage', 'tax': {'rate': 0.13, 'tax_wage': True}},
+    {'name': 'benefit', 'social': {'unemployment_benefit': 20000}},
+    {'name': 'export', 'foreign_trade': {'total_export_value': 900000000, 'export_sector_3_share': 0.8}},
+    {'name': 'import', 'foreign_trade': {'import_share_household': 0.5}},
+    {'name': 'capital', 'bank': {'initial_capital': 2000000000}},
+]
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)  # NaN == NaN
+
+
+def test_variants_match_separate_runs(small_config):
+    """Фазы ансамбля повторяют step() агентов: каждый вариант совпадает с отдельным прогоном."""
+    steps = small_config['model']['steps']
+    ensemble = EnsembleModel(small_config, VARIANTS)
+    for _ in range(steps):
+        ensemble.step()
+    for k, variant in enumerate(VARIANTS):
+        overrides = {key: value for key, value in variant.items() if key != 'name'}
+        model = EconomyModel(apply_overrides(small_config, overrides))
+        for _ in range(steps):
+            model.step()
+        assert len(ensemble.data[k]) == len(model.metrics.data) == steps
+        for expected, actual in zip(model.metrics.data, ensemble.data[k]):
+            assert expected.keys() == actual.keys()
+            mismatched = [key for key in expected if not _same(expected[key], actual[key])]
+            assert not mismatched, (variant['name'], expected['step'], mismatched)
+        # Остатки всех счетов (налоги и переводы, которые не видны в метриках)
+        accounts = model.clearing_house.accounts
+        assert set(accounts) <= set(ensemble.account_ids)
+        assert [accounts.get(aid, 0) for aid in ensemble.account_ids] == ensemble.ledger[k].tolist()
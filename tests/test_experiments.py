@@ -0,0 +1,30 @@
+import math
+
+import pytest
+
+from core.experiments import paired_comparison, t_cdf, t_quantile
+
+
+@pytest.mark.parametrize('df, expected', [
+    (1, 12.7062047), (2, 4.3026527), (3, 3.1824463), (4, 2.7764451), (9, 2.2621572), (30, 2.0422725),
+])
+def test_t_quantile_table(df, expected):
+    assert t_quantile(0.975, df) == pytest.approx(expected, abs=1e-6)
+    assert t_quantile(0.025, df) == pytest.approx(-expected, abs=1e-6)
+
+
+def test_t_quantile_fractional_df_and_limits():
+    # Дробные степени свободы (Уэлч) лежат между целыми
+    assert t_quantile(0.975, 3) < t_quantile(0.975, 2.5) < t_quantile(0.975, 2)
+    assert t_cdf(t_quantile(0.9, 7.3), 7.3) == pytest.approx(0.9, abs=1e-12)
+    assert t_quantile(0.975, math.inf) == pytest.approx(1.959964, abs=1e-6)
+
+
+@pytest.mark.parametrize('method', ['independent', 'crn', 'antithetic', 'stratified'])
+def test_paired_comparison_report(small_config, method):
+    small_config['model']['steps'] = 2
+    report = paired_comparison(small_config, {'tax': {'rate': 0.2}}, replications=2, method=method,
+                               metrics=('gini_income',))
+    row, = report
+    assert row['metric'] == 'gini_income' and row['method'] == method
+    assert row['observations'] == (1 if method == 'antithetic' else 2)
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from core.labor_market import EXCHANGE_ID, ROLES
+from core.model import EconomyModel
+
+
+@pytest.fixture
+def market_config(small_config):
+    # Повышенные ставки: за несколько шагов проходят и увольнения, и наймы
+    small_config['labor_market'] = {'separation_rate': 0.1, 'hiring_rate': 0.5}
+    return small_config
+
+
+def _check_state(model):
+    market = model.labor_market
+    n_firms = len(model.firms)
+    employed = np.flatnonzero(market.employer >= 0)
+
+    # filled – число работников по (фирма, роль), не больше мест
+    filled = np.zeros((n_firms, 3), dtype=np.int64)
+    np.add.at(filled, (market.employer[employed], market.role[employed]), 1)
+    assert market.filled.tolist() == filled.tolist()
+    assert (market.filled <= market.capacity).all()
+    assert (market.role[market.employer < 0] == -1).all()
+
+    # payroll – сумма зарплат по ролям работников фирмы
+    for f, firm in enumerate(model.firms):
+        roster = market.roster(firm.unique_id)
+        assert len(roster) == len(market.rosters[f]) == market.filled[f].sum()
+        assert market.payroll[f] == sum(wage for _, wage in roster) == market.payroll_of(firm.unique_id)
+        # Работники – в регионе своей фирмы, с её ID и своей ролью
+        for hh, _ in roster:
+            assert hh.region_id == firm.region_id
+            assert hh.employer_id == firm.unique_id
+    assert sorted(h for r in market.rosters for h in r) == employed.tolist()
+
+    # Занятые не стоят на учёте биржи, стоящие на учёте – у биржи
+    assert not (market.on_exchange & (market.employer >= 0)).any()
+    households = model.households
+    for h in employed.tolist():
+        assert households[h].job_role == ROLES[market.role[h]]
+    for h in np.flatnonzero(market.on_exchange).tolist():
+        assert households[h].employer_id == EXCHANGE_ID and households[h].job_role is None
+
+
+def _check_roles_by_age(market, hh_idx, firm_idx, roles):
+    """Внутри региона места директоров получают старшие, затем менеджеры, затем рабочие."""
+    codes = market.hh_region_code[hh_idx]
+    assert (codes == market.firm_region_code[firm_idx]).all()
+    for code in np.unique(codes):
+        in_region = codes == code
+        ages = market.hh_age[hh_idx[in_region]]
+        region_roles = roles[in_region]
+        for younger_role in (1, 2):
+            older = ages[region_roles < younger_role]
+            younger = ages[region_roles >= younger_role]
+            if len(older) and len(younger):
+                assert older.min() >= younger.max()
+
+
+def test_initial_match(market_config):
+    model = EconomyModel(market_config)
+    market = model.labor_market
+    _check_state(model)
+
+    employed = np.flatnonzero(market.employer >= 0)
+    _check_roles_by_age(market, employed, market.employer[employed], market.role[employed])
+    # Каждый соискатель либо работает, либо стоит на учёте биржи
+    seekers = np.flatnonzero(market.job_seeker)
+    assert ((market.employer[seekers] >= 0) ^ market.on_exchange[seekers]).all()
+    assert (market.role[employed] == 0).any()
+
+
+def test_state_consistent_after_steps(market_config, monkeypatch):
+    model = EconomyModel(market_config)
+    market = model.labor_market
+    batches, separated = [], []
+    hire, separate = market._hire, market._separate
+
+    def recording_hire(hh_idx, firm_idx, roles):
+        batches.append((hh_idx.copy(), firm_idx.copy(), roles.copy()))
+        hire(hh_idx, firm_idx, roles)
+
+    def recording_separate(hh_idx):
+        separated.extend(hh_idx.tolist())
+        separate(hh_idx)
+
+    monkeypatch.setattr(market, '_hire', recording_hire)
+    monkeypatch.setattr(market, '_separate', recording_separate)
+    for _ in range(4):
+        market.step()
+        _check_state(model)
+
+    # Были и увольнения, и наймы с биржи
+    assert separated and sum(len(b[0]) for b in batches) > 0
+    for hh_idx, firm_idx, roles in batches:
+        _check_roles_by_age(market, hh_idx, firm_idx, roles)
+
+
+def test_slots_fill_evenly_across_firms(small_config):
+    """Ключ слота – доля занятых мест роли: после подбора доли фирм региона различаются мало."""
+    model = EconomyModel(small_config)
+    market = model.labor_market
+    share = market.filled[:, 2] / market.capacity[:, 2]
+    for code in range(len(market.regions)):
+        firms = np.flatnonzero((market.firm_region_code == code) & (market.capacity[:, 2] > 0))
+        if len(firms) > 1:
+            # Разброс не больше одного места в пересчёте на самую маленькую фирму
+            assert np.ptp(share[firms]) <= 1 / market.capacity[firms, 2].min() + 1e-12
+
+
+def test_households_have_no_sector(small_config):
+    """Сектор есть только у фирм: в подборе он служит лишь для разбиения ничьих."""
+    model = EconomyModel(small_config)
+    assert not any(hasattr(hh, 'sector') for hh in model.households)
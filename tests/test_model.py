@@ -0,0 +1,41 @@
+import pytest
+
+from core.model import EconomyModel
+
+
+def test_every_agent_has_own_account(small_config):
+    model = EconomyModel(small_config)
+    agents = model.households + model.firms + model.self_employed
+    ids = [a.unique_id for a in agents]
+    assert len(set(ids)) == len(ids)
+    assert set(ids) <= set(model.clearing_house.accounts)
+    balances = [h.savings for h in model.households] + [f.balance for f in model.firms]
+    assert [model.clearing_house.accounts[i] for i in ids[:len(balances)]] == balances
+
+
+def test_reopened_account_fails(small_config):
+    model = EconomyModel(small_config)
+    with pytest.raises(ValueError, match='уже открыт'):
+        model.clearing_house.add_account(model.firms[0].unique_id, 0)
+
+
+def test_post_matches_transfers(small_config):
+    posted, transferred = EconomyModel(small_config), EconomyModel(small_config)
+    hh = [h.unique_id for h in posted.households[:2]]
+    firm = posted.firms[0].unique_id
+    posted.clearing_house.post(hh, [115, 230], [firm, 5], [200, 100], tax=45)
+    transferred.clearing_house.transfer(hh[0], firm, 100, is_taxable=True, tax_rate=0.15)
+    transferred.clearing_house.transfer(hh[1], firm, 100, is_taxable=True, tax_rate=0.15)
+    transferred.clearing_house.transfer(hh[1], 5, 100, is_taxable=True, tax_rate=0.15)
+    assert posted.clearing_house.accounts == transferred.clearing_house.accounts
+    with pytest.raises(ValueError, match='не сбалансирована'):
+        posted.clearing_house.post(hh, [100, 0], [firm], [99])
+
+
+def test_bank_stats_exclude_foreign_account(small_config):
+    model = EconomyModel(small_config)
+    model.step()
+    model.central_bank.update_stats()
+    balances = [b for aid, b in model.clearing_house.accounts.items() if aid != 5]
+    assert model.central_bank.total_loans == -sum(b for b in balances if b < 0)
+    assert model.central_bank.total_deposits == sum(b for b in balances if b > 0)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from core.model import EconomyModel
+from utils.panel import PanelReader
+
+
+def _run(config, path, every, compress, steps=7):
+    """Прогон с панелью; ожидаемые значения снимаются с модели в момент каждой записи."""
+    config['households']['count'] = 300
+    config['firms']['count'] = 40
+    config['self_employed']['count'] = 40
+    config['panel'] = {'enabled': True, 'path': str(path), 'every': every, 'chunk_steps': 3, 'compress': compress}
+    model = EconomyModel(config)
+    expected = {'steps': [], 'households': [], 'firms': []}
+    record = model.panel.record
+
+    def snapshot(step):
+        if step % every == 0:
+            accounts = model.clearing_house.accounts
+            expected['steps'].append(step)
+            expected['households'].append({
+                'income_labor': [h.income_labor for h in model.households],
+                'employer_id': [-1 if h.employer_id is None else h.employer_id for h in model.households],
+                'balance': [accounts[h.unique_id] for h in model.households],
+            })
+            expected['firms'].append({'balance': [accounts[f.unique_id] for f in model.firms]})
+        record(step)
+
+    model.panel.record = snapshot
+    for _ in range(steps):
+        model.step()
+    model.panel.close()
+    return model, expected
+
+
+@pytest.fixture(params=[(1, False), (2, False), (1, True), (3, True)], ids=lambda p: f"every{p[0]}-{'npz' if p[1] else 'npy'}")
+def panel(request, small_config, tmp_path):
+    every, compress = request.param
+    model, expected = _run(small_config, tmp_path, every, compress)
+    return model, expected, PanelReader(str(tmp_path)), compress
+
+
+def _matrix(expected, group, column):
+    return np.array([snap[column] for snap in expected[group]], dtype=np.int64)
+
+
+def test_full_read_matches_model(panel):
+    model, expected, reader, _ = panel
+    assert reader.steps('households').tolist() == expected['steps']
+    for group, column in [('households', 'income_labor'), ('households', 'employer_id'),
+                          ('households', 'balance'), ('firms', 'balance')]:
+        steps, ids, data = reader.read(group, column)
+        assert steps.tolist() == expected['steps']
+        assert data.tolist() == _matrix(expected, group, column).tolist()
+    # Остаток домохозяйства – его собственный счёт, а не счёт фирмы с тем же ID
+    assert not set(reader.agent_ids('households').tolist()) & set(reader.agent_ids('firms').tolist())
+
+
+def test_agent_step_and_region_slices(panel):
+    model, expected, reader, _ = panel
+    full = _matrix(expected, 'households', 'balance')
+    all_ids = reader.agent_ids('households').tolist()
+    rows = np.array(expected['steps'])
+
+    agents = [all_ids[5], all_ids[0], all_ids[200]]
+    steps, ids, data = reader.read('households', 'balance', agents=agents)
+    assert ids.tolist() == agents
+    assert data.tolist() == full[:, [5, 0, 200]].tolist()
+
+    steps, ids, data = reader.read('households', 'balance', steps=(2, 6))
+    in_range = (rows >= 2) & (rows < 6)
+    assert steps.tolist() == rows[in_range].tolist()
+    assert data.tolist() == full[in_range].tolist()
+
+    region = model.households[0].region_id
+    positions = [i for i, h in enumerate(model.households) if h.region_id == region]
+    steps, ids, data = reader.read('households', 'balance', agents=agents, steps=(2, 6), region=region)
+    picked = [i for i in [5, 0, 200] if i in positions]
+    assert ids.tolist() == [all_ids[i] for i in picked]
+    assert data.tolist() == full[in_range][:, picked].tolist()
+    steps, ids, data = reader.read('households', 'balance', region=region)
+    assert ids.tolist() == [all_ids[i] for i in positions]
+    assert data.tolist() == full[:, positions].tolist()
+
+    steps, ids, data = reader.read('households', 'balance', steps=(100, 200))
+    assert steps.tolist() == [] and data.shape == (0, len(all_ids))
+
+
+def test_chunk_storage(panel, tmp_path):
+    _, _, reader, compress = panel
+    chunks = reader.meta['groups']['households']['chunks']
+    assert all(len(chunk['steps']) <= 3 for chunk in chunks)
+    column = reader._load_column('households', chunks[0], 'balance')
+    if compress:
+        assert (tmp_path / 'households' / (chunks[0]['name'] + '.npz')).exists()
+        assert not isinstance(column, np.memmap)
+    else:
+        assert (tmp_path / 'households' / chunks[0]['name'] / 'balance.npy').exists()
+        assert isinstance(column, np.memmap)
@@ -0,0 +1,104 @@
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.experiments import paired_comparison
+from utils import result_cache
+from utils.result_cache import ResultCache
+
+
+def _metrics(value, rows=20):
+    return [{'step': i, 'gdp': value} for i in range(rows)]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Время доступа растёт на каждом вызове, чтобы порядок LRU не зависел от разрешения часов
+    ticks = itertools.count(1)
+    monkeypatch.setattr(result_cache.time, 'time', lambda: float(next(ticks)))
+
+
+def _entry_size(tmp_path):
+    probe = ResultCache(str(tmp_path / 'probe'))
+    probe.put('a', _metrics(0))
+    return probe.stats()['size_bytes']
+
+
+def test_lru_evicts_least_recently_used(tmp_path, clock):
+    size = _entry_size(tmp_path)
+    cache = ResultCache(str(tmp_path / 'cache'), max_size=int(2.5 * size))
+    cache.put('a', _metrics(1))
+    cache.put('b', _metrics(2))
+    assert cache.get('a') == _metrics(1)  # 'a' становится свежее 'b'
+    cache.put('c', _metrics(3))
+
+    assert cache.get('b') is None
+    assert cache.get('a') == _metrics(1) and cache.get('c') == _metrics(3)
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['size_bytes'] <= cache.max_size
+    assert sorted(os.listdir(cache.entries_dir)) == ['a', 'c']
+
+
+def test_new_entry_kept_even_above_limit(tmp_path, clock):
+    cache = ResultCache(str(tmp_path), max_size=1)
+    cache.put('a', _metrics(1))
+    cache.put('b', _metrics(2))
+    assert cache.get('a') is None and cache.get('b') == _metrics(2)
+
+
+def test_put_existing_key_keeps_first_result(tmp_path, clock):
+    cache = ResultCache(str(tmp_path))
+    cache.put('a', _metrics(1))
+    cache.put('a', _metrics(2), checkpoint={1: 10})
+
+    assert cache.get('a') == _metrics(1)
+    assert cache.get_checkpoint('a') is None
+    assert cache.stats()['entries'] == 1
+    # Временные каталоги повторной записи удалены
+    assert sorted(os.listdir(tmp_path)) == ['.lock', 'entries', 'index.json']
+
+
+def test_concurrent_put_and_get(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    keys = [f"k{i}" for i in range(8)]
+
+    def work(n):
+        key = keys[n % len(keys)]
+        cache.put(key, _metrics(n % len(keys)))
+        return key, cache.get(key)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(work, range(64)))
+
+    for key, data in results:
+        assert data == _metrics(int(key[1:]))
+    stats = cache.stats()
+    assert stats['entries'] == len(keys)
+    assert stats['hits'] == 64 and stats['misses'] == 0
+    assert sorted(os.listdir(cache.entries_dir)) == sorted(keys)
+
+
+def test_format_stats_reports_limit(tmp_path):
+    assert 'без ограничения' in ResultCache(str(tmp_path)).format_stats()
+    assert 'лимит: 1.5 МБ' in ResultCache(str(tmp_path), max_size=int(1.5 * 2**20)).format_stats()
+
+
+@pytest.mark.parametrize('method, treatment', [
+    ('crn', {'tax': {'rate': 0.2}}),             # пара через ансамбль
+    ('independent', {'tax': {'rate': 0.2}}),     # отдельные прогоны
+])
+def test_paired_comparison_uses_cache(small_config, tmp_path, method, treatment):
+    small_config['model']['steps'] = 2
+    cache = ResultCache(str(tmp_path))
+    first = paired_comparison(small_config, treatment, replications=2, method=method,
+                              metrics=('gini_income',), cache=cache)
+    runs = cache.stats()['entries']
+    assert runs == 4 and cache.stats()['hits'] == 0
+
+    second = paired_comparison(small_config, treatment, replications=2, method=method,
+                               metrics=('gini_income',), cache=cache)
+    assert second == first
+    assert cache.stats()['entries'] == runs and cache.stats()['hits'] == runs
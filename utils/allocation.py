@@ -0,0 +1,177 @@
+import numpy as np
+
+# Корзин гистограммы дробных частей в AllocationPlan.split_many (степень двойки)
+SPLIT_BUCKETS = 128
+
+
+class AllocationPlan:
+    """
+    Предвычисленный план распределения суммы по неизменному вектору весов.
+
+    Хранит получателей, нормированные веса и порядок разбиения ничьих, поэтому
+    split(total) сводится к умножению и коррекции остатка. Результат совпадает
+    с proportional_split(total, weights) (метод наибольшего остатка).
+    """
+
+    def __init__(self, agents, weights):
+        self.agents = list(agents)
+        self.ids = [a.unique_id for a in self.agents]
+        weights = np.asarray(weights, dtype=float)
+        self.total_weight = float(weights.sum()) if len(weights) else 0.0
+        if self.total_weight:
+            self.norm_weights = weights / self.total_weight
+        else:
+            self.norm_weights = np.zeros(len(weights))
+        self._groups = None
+
+    def __len__(self):
+        return len(self.agents)
+
+    def split(self, total):
+        """Возвращает массив целых долей (int64), сумма которых равна total."""
+        n = len(self.agents)
+        if n == 0 or total == 0 or self.total_weight == 0:
+            return np.zeros(n, dtype=np.int64)
+        ideal = total * self.norm_weights
+        floors = np.trunc(ideal)
+        remainder = int(total - floors.sum())
+        result = floors.astype(np.int64)
+        if remainder > 0:
+            # Стабильная сортировка по убыванию дробной части: при равенстве – меньший индекс
+            order = np.argsort(floors - ideal, kind='stable')
+            result[order[:remainder]] += 1
+        return result
+
+    def _weight_groups(self):
+        """Группы получателей с равными весами: (веса, размеры, начала групп, получатели по группам)."""
+        if self._groups is None:
+            values, inverse = np.unique(self.norm_weights, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(values))
+            self._groups = (values, counts, np.cumsum(counts) - counts, np.argsort(inverse, kind='stable'))
+        return self._groups
+
+    def split_many(self, totals, tax_rate=None):
+        """
+        Σ split(total) по массиву неотрицательных сумм totals за один проход.
+
+        Возвращает (сумма долей по получателям, налоги), где налоги[h] – сумма
+        round(доля * tax_rate) по получателям для totals[h] (нули, если tax_rate не задан).
+        У получателей с равными весами одинаковая дробная часть, а ничьи split()
+        разбивает по индексу, поэтому +1 внутри группы равных весов достаётся первым
+        её получателям. Граница остатка ищется по гистограмме дробных частей групп
+        (SPLIT_BUCKETS корзин, веса – размеры групп); сортируются только группы из
+        корзины, где проходит граница. Суммы, у которых граница приходится на ничью
+        между разными группами, считаются обычным split().
+        """
+        totals = np.asarray(totals, dtype=np.int64)
+        n = len(self.agents)
+        result = np.zeros(n, dtype=np.int64)
+        taxes = np.zeros(len(totals), dtype=np.int64)
+        if n == 0 or self.total_weight == 0 or len(totals) == 0:
+            return result, taxes
+        values, counts, starts, order = self._weight_groups()
+        g = len(values)
+        B = SPLIT_BUCKETS
+        per_group = np.zeros(g, dtype=np.int64)  # доли, общие для всех получателей группы
+        bumps = np.zeros(n + 1, dtype=np.int64)  # +1 первым получателям групп (разностный массив)
+        chunk = max(1, 2**16 // g)
+        bucket_weights = np.tile(counts.astype(float), chunk)
+        # Буферы чанка (R × g) переиспользуются: выделение больших массивов на каждый чанк дороже арифметики
+        frac_buf, floors_buf, work_buf = (np.empty(chunk * g) for _ in range(3))
+        bucket_buf = np.empty(chunk * g, dtype=np.int32)
+        mask_buf = np.empty(chunk * g, dtype=bool)
+        for lo in range(0, len(totals), chunk):
+            total = totals[lo:lo + chunk]
+            R = len(total)
+            rows = np.arange(R)
+            frac, floors, work = (buf[:R * g].reshape(R, g) for buf in (frac_buf, floors_buf, work_buf))
+            bucket, mask = bucket_buf[:R * g].reshape(R, g), mask_buf[:R * g].reshape(R, g)
+            # Те же ideal и floors, что в split() (floors в float: суммы точны до 2**53)
+            np.multiply(total.astype(float)[:, None], values, out=frac)
+            np.trunc(frac, out=floors)
+            frac -= floors
+            remainder = total - (floors @ counts).astype(np.int64)
+
+            # Корзина дробной части (B – степень двойки, умножение точное), со сдвигом строки
+            np.multiply(frac, B, out=work)
+            bucket[...] = work
+            bucket += (rows * B).astype(np.int32)[:, None]
+            hist = np.bincount(bucket.ravel(), weights=bucket_weights[:R * g], minlength=R * B).reshape(R, B)
+            # Граница – корзина edge: в корзинах выше неё не больше remainder получателей, начиная с неё – больше
+            below = np.cumsum(hist, axis=1)  # получателей в корзинах 0..b
+            edge = np.argmax(below >= (n - remainder)[:, None], axis=1)
+            overflow = remainder >= n  # остаток не меньше числа получателей (вырожденные веса) – в split()
+            edge[overflow] = B - 1
+            above = n - below[rows, edge].astype(np.int64)
+
+            # Группы пограничной корзины по строкам, внутри строки – по убыванию дробной части
+            np.equal(bucket, (edge + rows * B).astype(np.int32)[:, None], out=mask)
+            cand_row, cand_group = np.divmod(np.flatnonzero(mask), g)
+            cand_frac = frac[cand_row, cand_group]
+            srt = np.lexsort((-cand_frac, cand_row))
+            cand_row, cand_group, cand_frac = cand_row[srt], cand_group[srt], cand_frac[srt]
+            cand_cum = np.cumsum(counts[cand_group])
+            row_start = np.searchsorted(cand_row, rows)
+            row_end = np.searchsorted(cand_row, rows, side='right')
+            before = np.where(row_start > 0, cand_cum[np.maximum(row_start - 1, 0)], 0)
+            # Первая группа, которая получает +1 не целиком
+            pos = np.searchsorted(cand_cum, remainder - above + before, side='right')
+            pos = np.clip(pos, 0, np.maximum(row_end - 1, 0))
+            threshold = cand_frac[pos]
+            partial = remainder - above - (cand_cum[pos] - counts[cand_group[pos]] - before)
+            prev, after = np.maximum(pos - 1, 0), np.minimum(pos + 1, len(cand_frac) - 1)
+            tie = (overflow
+                   | (pos > row_start) & (cand_frac[prev] == threshold)
+                   | (partial > 0) & (pos + 1 < row_end) & (cand_frac[after] == threshold))
+
+            fast = ~tie
+            np.greater(frac, threshold[:, None], out=mask)
+            amounts = np.add(floors, mask, out=work)
+            per_group += (fast.astype(float) @ amounts).astype(np.int64)
+            cut = fast & (partial > 0)
+            partial_group = cand_group[pos[cut]]
+            bumps += (np.bincount(starts[partial_group], minlength=n + 1)
+                      - np.bincount(starts[partial_group] + partial[cut], minlength=n + 1))
+            if tax_rate is not None:
+                np.multiply(amounts, tax_rate, out=frac)
+                chunk_taxes = np.rint(frac, out=frac) @ counts
+                low = floors[rows[cut], partial_group]
+                chunk_taxes[cut] += (np.rint((low + 1) * tax_rate) - np.rint(low * tax_rate)) * partial[cut]
+                taxes[lo:lo + chunk][fast] = chunk_taxes[fast].astype(np.int64)
+            for h in np.flatnonzero(tie):
+                split_amounts = self.split(int(total[h]))
+                result += split_amounts
+                if tax_rate is not None:
+                    taxes[lo + h] = int(np.rint(split_amounts * tax_rate).sum())
+        result[order] += np.repeat(per_group, counts) + np.cumsum(bumps)[:n]
+        return result, taxes
+
+    def pairs(self, total):
+        """Итератор по (агент, сумма) с ненулевыми суммами."""
+        amounts = self.split(total)
+        for i in np.flatnonzero(amounts):
+            yield self.agents[i], int(amounts[i])
+
+
+class AllocationPlans:
+    """
+    Кэш планов распределения модели.
+
+    План строится один раз по ключу и живёт до конца прогона: агенты создаются
+    только при инициализации модели, а веса планов (размеры фирм, население
+    регионов) после неё не меняются. ConsumptionEngine и EnsembleModel держат
+    ссылки на планы и полагаются на это.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._plans = {}
+
+    def get(self, key, builder):
+        """Возвращает план по ключу; builder() -> (agents, weights) вызывается при промахе."""
+        plan = self._plans.get(key)
+        if plan is None:
+            agents, weights = builder()
+            plan = AllocationPlan(agents, weights)
+            self._plans[key] = plan
+        return plan
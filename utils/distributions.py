@@ -3,145 +3,157 @@ from agents.household import Household
 from agents.firm import Firm
 from agents.self_employed import SelfEmployed
 
-def generate_households(config, model):
+CATEGORIES = ['worker', 'pensioner', 'disabled', 'veteran', 'child_family', 'unemployed']
+CATEGORY_PROBS = [0.5, 0.25, 0.03, 0.01, 0.15, 0.06]  # примерно
+
+
+def generate_households(config, model, first_id=1000):
     """
     Генерирует список домохозяйств на основе конфигурации.
     config: словарь из раздела 'households'
+    first_id: ID первого домохозяйства (далее подряд)
+    Каждый атрибут разыгрывается из своего потока model.random_streams.
     """
-    np.random.seed(model.config['model']['seed'])
+    streams = model.random_streams
     count = config['count']
     unemployment_rate = config['unemployment_rate']
     region_ids = list(range(101, 109))  # 8 регионов
     households = []
-    next_id = 1000  # начнём с 1000, чтобы не пересекаться с гос. агентами
+    next_id = first_id
 
     # Распределение по регионам (равномерное)
-    region_counts = np.random.multinomial(count, [1/8]*8)
-
-    for reg_idx, reg_count in enumerate(region_counts):
-        reg_id = region_ids[reg_idx]
-        for _ in range(reg_count):
-            # Категории
-            category = np.random.choice(
-                ['worker', 'pensioner', 'disabled', 'veteran', 'child_family', 'unemployed'],
-                p=[0.5, 0.25, 0.03, 0.01, 0.15, 0.06]  # примерно
-            )
-            # Определяем employer_id
-            if category == 'unemployed':
-                employer_id = 3  # биржа труда
-            else:
-                # Позже привяжем к фирме
-                employer_id = None  # временно
-            # Начальные сбережения (логнормальное)
-            savings = max(0, int(np.random.lognormal(
-                mean=np.log(config['initial_savings_mean']),
-                sigma=config['initial_savings_std']/config['initial_savings_mean']
-            )))
-            # consumption_rate (нормальное)
-            consumption_rate = np.random.normal(config['consumption_rate_mean'], config['consumption_rate_std'])
-            consumption_rate = max(0.1, min(2.0, consumption_rate))  # ограничим
-
-            hh_params = {
-                'region_id': reg_id,
-                'employer_id': employer_id,
-                'category': category,
-                'age': np.random.randint(18, 80),
-                'children': np.random.poisson(0.5) if category in ['child_family', 'worker'] else 0,
-                'savings': savings,
-                'consumption_rate': consumption_rate,
-            }
-            hh = Household(next_id, model, hh_params)
-            households.append(hh)
-            next_id += 1
-
-    # Привязка работников к фирмам (будет позже)
+    region_counts = streams.stream('households/region').multinomial(count, [1/8]*8)
+    regions = np.repeat(region_ids, region_counts)
+
+    # Категории
+    categories = streams.stream('households/category').choice(CATEGORIES, CATEGORY_PROBS, size=count)
+    # Начальные сбережения (логнормальное)
+    savings = streams.stream('households/savings').lognormal(
+        mean=np.log(config['initial_savings_mean']),
+        sigma=config['initial_savings_std']/config['initial_savings_mean'],
+        size=count,
+    )
+    # consumption_rate (нормальное), ограничим
+    consumption_rates = np.clip(
+        streams.stream('households/consumption_rate').normal(
+            config['consumption_rate_mean'], config['consumption_rate_std'], size=count),
+        0.1, 2.0,
+    )
+    ages = streams.stream('households/age').integers(18, 80, size=count)
+    children = streams.stream('households/children').poisson(0.5, size=count)
+
+    # Списки Python вместо поэлементного доступа к массивам numpy (быстрее на больших count)
+    regions, categories, ages, children = regions.tolist(), categories.tolist(), ages.tolist(), children.tolist()
+    savings, consumption_rates = savings.tolist(), consumption_rates.tolist()
+
+    for i in range(count):
+        category = categories[i]
+        # Определяем employer_id
+        if category == 'unemployed':
+            employer_id = 3  # биржа труда
+        else:
+            # Работников привязывает к фирмам рынок труда (core/labor_market.py)
+            employer_id = None
+
+        hh_params = {
+            'region_id': regions[i],
+            'employer_id': employer_id,
+            'category': category,
+            'age': ages[i],
+            'children': children[i] if category in ['child_family', 'worker'] else 0,
+            'savings': max(0, int(savings[i])),
+            'consumption_rate': consumption_rates[i],
+        }
+        hh = Household(next_id, model, hh_params)
+        households.append(hh)
+        next_id += 1
+
     return households
 
-def generate_firms(config, model):
+def generate_firms(config, model, first_id):
     """
     Генерирует список фирм.
     config: словарь из раздела 'firms'
+    first_id: ID первой фирмы (далее подряд)
     """
-    np.random.seed(model.config['model']['seed'])
+    streams = model.random_streams
     count = config['count']
     sector_dist = config['sector_distribution']
     region_ids = list(range(101, 109))
     firms = []
-    next_id = 2000  # начнём с 2000
-
-    # Распределение по секторам
-    sector_counts = np.random.multinomial(count, sector_dist)
-
-    for sector, sector_count in enumerate(sector_counts, start=1):
-        if sector_count == 0:
-            continue
-        # Распределение по регионам (равномерное)
-        reg_counts = np.random.multinomial(sector_count, [1/8]*8)
-        for reg_idx, reg_count in enumerate(reg_counts):
-            reg_id = region_ids[reg_idx]
-            for _ in range(reg_count):
-                # Размер фирмы (логнормальное)
-                size_mean = config['size_mean']
-                size_std = config['size_std']
-                size = int(np.random.lognormal(mean=np.log(size_mean), sigma=size_std/size_mean))
-                size = max(1, size)
-                # Категории работников
-                share_dir = config['share_director']
-                share_men = config['share_manager']
-                size_dir = max(1, int(size * share_dir))
-                size_men = max(1, int(size * share_men))
-                size_worker = size - size_dir - size_men
-                if size_worker < 1:
-                    size_worker = 1
-                    size_dir = 1
-                    size_men = 1
-
-                # Зарплаты
-                base_wage = config['wage_base_by_sector'][sector-1]
-                wage_per_dir = round(base_wage * config['wage_ratio_director'])
-                wage_per_men = round(base_wage * config['wage_ratio_manager'])
-                wage_per_worker = base_wage
-
-                # Начальный баланс (несколько месячных зарплат)
-                monthly_payroll = (size_dir * wage_per_dir + size_men * wage_per_men + size_worker * wage_per_worker)
-                initial_balance = monthly_payroll * config['initial_balance_months']
-
-                firm_params = {
-                    'sector': sector,
-                    'region_id': reg_id,
-                    'size_dir': size_dir,
-                    'size_men': size_men,
-                    'size_worker': size_worker,
-                    'wage_per_dir': wage_per_dir,
-                    'wage_per_men': wage_per_men,
-                    'wage_per_worker': wage_per_worker,
-                    'balance': initial_balance,
-                    'export_share': 0.6 if sector == 3 else 0.0,
-                }
-                firm = Firm(next_id, model, firm_params)
-                firms.append(firm)
-                next_id += 1
+    next_id = first_id
+
+    # Распределение по секторам и регионам (равномерное); фирмы упорядочены по (сектор, регион)
+    sector_counts = streams.stream('firms/sector').multinomial(count, sector_dist)
+    sectors = np.repeat(np.arange(1, len(sector_counts) + 1), sector_counts)
+    regions = streams.stream('firms/region').choice(region_ids, [1/8]*8, size=count)
+    order = np.lexsort((regions, sectors))
+    # Размер фирмы (логнормальное)
+    size_mean = config['size_mean']
+    size_std = config['size_std']
+    sizes = streams.stream('firms/size').lognormal(mean=np.log(size_mean), sigma=size_std/size_mean, size=count)
+
+    for i in range(count):
+        sector = int(sectors[order[i]])
+        reg_id = int(regions[order[i]])
+        size = max(1, int(sizes[i]))
+        # Категории работников
+        share_dir = config['share_director']
+        share_men = config['share_manager']
+        size_dir = max(1, int(size * share_dir))
+        size_men = max(1, int(size * share_men))
+        size_worker = size - size_dir - size_men
+        if size_worker < 1:
+            size_worker = 1
+            size_dir = 1
+            size_men = 1
+
+        # Зарплаты
+        base_wage = config['wage_base_by_sector'][sector-1]
+        wage_per_dir = round(base_wage * config['wage_ratio_director'])
+        wage_per_men = round(base_wage * config['wage_ratio_manager'])
+        wage_per_worker = base_wage
+
+        # Начальный баланс (несколько месячных зарплат)
+        monthly_payroll = (size_dir * wage_per_dir + size_men * wage_per_men + size_worker * wage_per_worker)
+        initial_balance = monthly_payroll * config['initial_balance_months']
+
+        firm_params = {
+            'sector': sector,
+            'region_id': reg_id,
+            'size_dir': size_dir,
+            'size_men': size_men,
+            'size_worker': size_worker,
+            'wage_per_dir': wage_per_dir,
+            'wage_per_men': wage_per_men,
+            'wage_per_worker': wage_per_worker,
+            'balance': initial_balance,
+            'export_share': 0.6 if sector == 3 else 0.0,
+        }
+        firm = Firm(next_id, model, firm_params)
+        firms.append(firm)
+        next_id += 1
     return firms
 
-def generate_self_employed(config, model):
-    """Генерирует самозанятых."""
-    np.random.seed(model.config['model']['seed'])
+def generate_self_employed(config, model, first_id):
+    """Генерирует самозанятых с ID first_id, first_id + 1, ..."""
+    streams = model.random_streams
     count = config['count']
     avg_income = config['avg_income']
     region_ids = list(range(101, 109))
     self_employed = []
-    next_id = 3000
-
-    reg_counts = np.random.multinomial(count, [1/8]*8)
-    for reg_idx, reg_count in enumerate(reg_counts):
-        reg_id = region_ids[reg_idx]
-        for _ in range(reg_count):
-            se_params = {
-                'region_id': reg_id,
-                'savings': np.random.randint(0, 50000),
-                'income': avg_income,
-            }
-            se = SelfEmployed(next_id, model, se_params)
-            self_employed.append(se)
-            next_id += 1
-    return self_employed
\ No newline at end of file
+    next_id = first_id
+
+    reg_counts = streams.stream('self_employed/region').multinomial(count, [1/8]*8)
+    regions = np.repeat(region_ids, reg_counts)
+    savings = streams.stream('self_employed/savings').integers(0, 50000, size=count)
+    for i in range(count):
+        se_params = {
+            'region_id': int(regions[i]),
+            'savings': int(savings[i]),
+            'income': avg_income,
+        }
+        se = SelfEmployed(next_id, model, se_params)
+        self_employed.append(se)
+        next_id += 1
+    return self_employed
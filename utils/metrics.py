@@ -9,56 +9,109 @@ class MetricsCollector:
 
     def collect(self, step):
         """Сбор метрик за текущий шаг."""
-        # Доходы домохозяйств
-        incomes = [hh.income_labor + hh.income_transfer for hh in self.model.households]
-        savings = [hh.savings for hh in self.model.households]
-        # Долги
-        hh_debt = sum(-s for s in savings if s < 0)
-        firm_debt = sum(-f.balance for f in self.model.firms if f.balance < 0)
-        # ВВП (упрощённо: сумма всех зарплат + прибыль фирм)
-        total_wages = sum(hh.income_labor for hh in self.model.households)
-        total_profits = sum(f.revenue - (f.size_dir*f.wage_per_dir + f.size_men*f.wage_per_men + f.size_worker*f.wage_per_worker) for f in self.model.firms)
-        gdp = total_wages + total_profits
-
+        model = self.model
+        households = model.households
+        firms = model.firms
         # Банковские показатели
-        bank = self.model.central_bank
+        bank = model.central_bank
         bank.update_stats()
-
-        metrics = {
-            'step': step,
-            'gdp': gdp,
-            'total_tax': self.model.tax_service.tax_collected,  # до перевода в Минфин
-            'export': sum(f.revenue * f.export_share for f in self.model.firms if f.sector == 3),
-            'import': self.model.foreign_sector.balance,  # не совсем точно, но для оценки
-            'avg_wage': np.mean([hh.income_labor for hh in self.model.households if hh.income_labor > 0]),
-            'unemployment': len([hh for hh in self.model.households if hh.employer_id == 3]) / len(self.model.households),
-            'gini_income': self.gini(incomes),
-            'gini_wealth': self.gini(savings),
-            'hh_debt': hh_debt,
-            'firm_debt': firm_debt,
-            'bank_capital': bank.capital,
-            'bank_loans': bank.total_loans,
-            'bank_deposits': bank.total_deposits,
-            'capital_adequacy': bank.get_capital_adequacy(),
-        }
-        self.data.append(metrics)
+        self.data.extend(monthly_metrics(
+            step,
+            income_labor=[[hh.income_labor for hh in households]],
+            income_transfer=[[hh.income_transfer for hh in households]],
+            savings=[hh.savings for hh in households],
+            unemployed=sum(1 for hh in households if hh.employer_id == 3),
+            firm_revenue=[[f.revenue for f in firms]],
+            firm_balance=[[f.balance for f in firms]],
+            firm_payroll=declared_payroll(firms),
+            export_share=export_shares(firms),
+            tax_collected=[model.tax_service.tax_collected],
+            foreign_balance=[model.foreign_sector.balance],
+            capital=[bank.capital],
+            loans=[bank.total_loans],
+            deposits=[bank.total_deposits],
+        ))
 
     def gini(self, x):
         """Коэффициент Джини."""
-        x = np.array(x)
-        if np.sum(x) == 0:
-            return 0
-        x = np.sort(x)
-        n = len(x)
-        cum = np.cumsum(x)
-        return (n + 1 - 2 * np.sum(cum) / cum[-1]) / n
+        return gini(x)
 
     def save(self, path):
         """Сохраняет метрики в CSV."""
-        if not self.data:
-            return
-        keys = self.data[0].keys()
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(self.data)
\ No newline at end of file
+        save_metrics(self.data, path)
+
+
+def gini(x):
+    """Коэффициент Джини."""
+    x = np.array(x)
+    if np.sum(x) == 0:
+        return 0
+    x = np.sort(x)
+    n = len(x)
+    cum = np.cumsum(x)
+    return (n + 1 - 2 * np.sum(cum) / cum[-1]) / n
+
+
+def declared_payroll(firms):
+    """Объявленный фонд оплаты труда фирм (по размеру и ставкам ролей)."""
+    return np.array([f.size_dir * f.wage_per_dir + f.size_men * f.wage_per_men + f.size_worker * f.wage_per_worker
+                     for f in firms], dtype=np.int64)
+
+
+def export_shares(firms):
+    """Доля экспорта в выручке фирм (учитывается только сектор 3)."""
+    return np.array([f.export_share if f.sector == 3 else 0.0 for f in firms], dtype=float)
+
+
+def monthly_metrics(step, income_labor, income_transfer, savings, unemployed, firm_revenue, firm_balance,
+                    firm_payroll, export_share, tax_collected, foreign_balance, capital, loans, deposits):
+    """
+    Метрики месяца для K вариантов (K=1 – одиночная модель), список из K словарей.
+
+    income_labor, income_transfer – K × домохозяйства; firm_revenue, firm_balance –
+    K × фирмы; tax_collected, foreign_balance, capital, loans, deposits – по вариантам.
+    Сбережения, число безработных, объявленный фонд оплаты труда и доли экспорта общие.
+    """
+    income_labor = np.asarray(income_labor, dtype=np.int64)
+    income_transfer = np.asarray(income_transfer, dtype=np.int64)
+    firm_revenue = np.asarray(firm_revenue, dtype=np.int64)
+    firm_balance = np.asarray(firm_balance, dtype=np.int64)
+    savings = np.asarray(savings, dtype=np.int64)
+    hh_debt = int(-savings[savings < 0].sum())
+    gini_wealth = gini(savings)
+    # ВВП (упрощённо: сумма всех зарплат + прибыль фирм)
+    total_profits = (firm_revenue - firm_payroll).sum(axis=1)
+    export = (firm_revenue * export_share).sum(axis=1)
+    rows = []
+    for k in range(len(income_labor)):
+        wages = income_labor[k]
+        loans_k = int(loans[k])
+        rows.append({
+            'step': step,
+            'gdp': int(wages.sum()) + int(total_profits[k]),
+            'total_tax': int(tax_collected[k]),  # до перевода в Минфин
+            'export': float(export[k]),
+            'import': int(foreign_balance[k]),  # не совсем точно, но для оценки
+            'avg_wage': np.mean(wages[wages > 0]),
+            'unemployment': unemployed / income_labor.shape[1],
+            'gini_income': gini(wages + income_transfer[k]),
+            'gini_wealth': gini_wealth,
+            'hh_debt': hh_debt,
+            'firm_debt': int(-firm_balance[k][firm_balance[k] < 0].sum()),
+            'bank_capital': int(capital[k]),
+            'bank_loans': loans_k,
+            'bank_deposits': int(deposits[k]),
+            'capital_adequacy': int(capital[k]) / loans_k if loans_k else float('inf'),
+        })
+    return rows
+
+
+def save_metrics(data, path):
+    """Сохраняет список словарей с метриками в CSV."""
+    if not data:
+        return
+    keys = data[0].keys()
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=keys)
+        writer.writeheader()
+        writer.writerows(data)
\ No newline at end of file
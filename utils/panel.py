@@ -0,0 +1,187 @@
+import json
+import os
+import uuid
+import numpy as np
+
+# Колонки панели по группам агентов
+HOUSEHOLD_COLUMNS = ('income_labor', 'income_transfer', 'balance', 'employer_id')
+FIRM_COLUMNS = ('revenue', 'balance')
+
+
+def _column(model, agents, column, ids):
+    """Значения колонки для списка агентов (int64)."""
+    n = len(agents)
+    if column == 'balance':
+        accounts = model.clearing_house.accounts
+        return np.fromiter((accounts.get(i, 0) for i in ids), dtype=np.int64, count=n)
+    if column == 'employer_id':
+        # None (не привязан) кодируется как -1
+        return np.fromiter((-1 if a.employer_id is None else a.employer_id for a in agents),
+                           dtype=np.int64, count=n)
+    return np.fromiter((getattr(a, column) for a in agents), dtype=np.int64, count=n)
+
+
+class PanelWriter:
+    """
+    Запись панельных микроданных (агент × шаг) на диск по чанкам.
+
+    Каждый чанк содержит chunk_steps записанных шагов. Без сжатия колонка чанка –
+    отдельный .npy файл формы (шаги, агенты), который читается через memmap;
+    при compress=True чанк – один .npz (zlib), колонки распаковываются по отдельности.
+    Структура каталога:
+        meta.json                       – агенты, регионы, колонки, список чанков
+        households/chunk_00000/*.npy    – или households/chunk_00000.npz
+        firms/...
+    """
+
+    def __init__(self, model, path, every=1, chunk_steps=12, compress=False):
+        self.model = model
+        self.path = path
+        self.every = max(1, int(every))
+        self.chunk_steps = max(1, int(chunk_steps))
+        self.compress = compress
+        self.groups = {
+            'households': (model.households, HOUSEHOLD_COLUMNS),
+            'firms': (model.firms, FIRM_COLUMNS),
+        }
+        self.meta = {'every': self.every, 'chunk_steps': self.chunk_steps,
+                     'compress': self.compress, 'groups': {}}
+        self._ids = {}
+        self._buffers = {}
+        self._buffer_steps = []
+        os.makedirs(path, exist_ok=True)
+        for group, (agents, columns) in self.groups.items():
+            os.makedirs(os.path.join(path, group), exist_ok=True)
+            ids = [a.unique_id for a in agents]
+            self._ids[group] = ids
+            self._buffers[group] = {c: [] for c in columns}
+            self.meta['groups'][group] = {
+                'agent_ids': ids,
+                'region_ids': [a.region_id for a in agents],
+                'columns': list(columns),
+                'chunks': [],
+            }
+        self._n_chunks = 0
+        self._write_meta()
+
+    def record(self, step):
+        """Снимок колонок агентов за шаг (если шаг кратен every)."""
+        if step % self.every:
+            return
+        for group, (agents, columns) in self.groups.items():
+            ids = self._ids[group]
+            buffers = self._buffers[group]
+            for column in columns:
+                buffers[column].append(_column(self.model, agents, column, ids))
+        self._buffer_steps.append(step)
+        if len(self._buffer_steps) >= self.chunk_steps:
+            self.flush()
+
+    def flush(self):
+        """Сбрасывает накопленные шаги в новый чанк."""
+        if not self._buffer_steps:
+            return
+        name = f"chunk_{self._n_chunks:05d}"
+        for group in self.groups:
+            buffers = self._buffers[group]
+            arrays = {c: np.stack(rows) for c, rows in buffers.items()}
+            group_dir = os.path.join(self.path, group)
+            if self.compress:
+                np.savez_compressed(os.path.join(group_dir, name + '.npz'), **arrays)
+            else:
+                chunk_dir = os.path.join(group_dir, name)
+                os.makedirs(chunk_dir, exist_ok=True)
+                for column, arr in arrays.items():
+                    np.save(os.path.join(chunk_dir, column + '.npy'), arr)
+            self.meta['groups'][group]['chunks'].append({'name': name, 'steps': list(self._buffer_steps)})
+            for rows in buffers.values():
+                rows.clear()
+        self._buffer_steps = []
+        self._n_chunks += 1
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, 'meta.json')
+        tmp = f"{meta_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, meta_path)
+
+
+class PanelReader:
+    """Чтение панели по агентам, диапазону шагов и региону без загрузки всей панели."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._index = {}
+
+    def agent_ids(self, group):
+        return np.asarray(self.meta['groups'][group]['agent_ids'], dtype=np.int64)
+
+    def region_ids(self, group):
+        return np.asarray(self.meta['groups'][group]['region_ids'], dtype=np.int64)
+
+    def steps(self, group):
+        return np.asarray([s for ch in self.meta['groups'][group]['chunks'] for s in ch['steps']], dtype=np.int64)
+
+    def columns(self, group):
+        return list(self.meta['groups'][group]['columns'])
+
+    def _agent_positions(self, group, agents, region):
+        """Индексы колонок для выбранных агентов и/или региона."""
+        if agents is None and region is None:
+            return None
+        if agents is not None:
+            if group not in self._index:
+                self._index[group] = {aid: i for i, aid in enumerate(self.meta['groups'][group]['agent_ids'])}
+            index = self._index[group]
+            positions = np.asarray([index[aid] for aid in agents], dtype=np.int64)
+        else:
+            positions = np.arange(len(self.meta['groups'][group]['agent_ids']))
+        if region is not None:
+            regions = self.region_ids(group)
+            positions = positions[regions[positions] == region]
+        return positions
+
+    def _load_column(self, group, chunk, column):
+        group_dir = os.path.join(self.path, group)
+        if self.meta['compress']:
+            with np.load(os.path.join(group_dir, chunk['name'] + '.npz')) as data:
+                return data[column]
+        return np.load(os.path.join(group_dir, chunk['name'], column + '.npy'), mmap_mode='r')
+
+    def read(self, group, column, agents=None, steps=None, region=None):
+        """
+        Возвращает (шаги, ID агентов, матрица [шаги × агенты]).
+        agents – список ID, steps – (start, stop) полуинтервал шагов, region – ID региона.
+        Читаются только чанки, пересекающиеся с диапазоном шагов.
+        """
+        positions = self._agent_positions(group, agents, region)
+        ids = self.agent_ids(group)
+        if positions is not None:
+            ids = ids[positions]
+        out_steps, parts = [], []
+        for chunk in self.meta['groups'][group]['chunks']:
+            chunk_steps = np.asarray(chunk['steps'], dtype=np.int64)
+            if steps is not None:
+                # Шаги внутри чанка записаны по возрастанию – диапазон шагов это срез строк,
+                # и memmap не копирует строки целиком до выбора агентов
+                start, stop = np.searchsorted(chunk_steps, steps)
+                if start == stop:
+                    continue
+                rows = slice(int(start), int(stop))
+            else:
+                rows = slice(None)
+            data = self._load_column(group, chunk, column)[rows]
+            if positions is not None:
+                data = data[:, positions]
+            parts.append(np.array(data))
+            out_steps.append(chunk_steps[rows])
+        if not parts:
+            return np.zeros(0, dtype=np.int64), ids, np.zeros((0, len(ids)), dtype=np.int64)
+        return np.concatenate(out_steps), ids, np.concatenate(parts)
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Каталоги и файлы, исходный код которых определяет результат симуляции
+CODE_DIRS = ('agents', 'core', 'utils')
+CODE_FILES = ('main.py',)
+
+_code_version = None
+
+
+def code_version():
+    """
+    Версия кода модели: sha256 по исходникам agents/, core/, utils/ и main.py.
+    Любая правка кода меняет ключ кэша, поэтому устаревшие результаты не используются.
+    """
+    global _code_version
+    if _code_version is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        paths = []
+        for d in CODE_DIRS:
+            base = os.path.join(root, d)
+            for dirpath, dirnames, filenames in os.walk(base):
+                dirnames[:] = sorted(n for n in dirnames if n != '__pycache__')
+                paths.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith('.py'))
+        paths.extend(os.path.join(root, name) for name in CODE_FILES)
+        h = hashlib.sha256()
+        for path in paths:
+            h.update(os.path.relpath(path, root).replace(os.sep, '/').encode('utf-8'))
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        _code_version = h.hexdigest()
+    return _code_version
+
+
+def config_key(config, seed, version=None):
+    """Канонический хэш (конфигурация, seed, версия кода)."""
+    payload = {
+        'config': config,
+        'seed': seed,
+        'code': version if version is not None else code_version(),
+    }
+    text = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _json_default(obj):
+    # numpy-скаляры (np.int64 и т.п.) приводим к обычным числам
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            total += os.path.getsize(os.path.join(dirpath, name))
+    return total
+
+
+class ResultCache:
+    """
+    Контентно-адресуемый кэш завершённых прогонов на локальном диске.
+
+    Структура каталога:
+        index.json            – размеры записей, время доступа и статистика
+        .lock                 – файл блокировки для параллельных процессов
+        entries/<key>/        – metrics.json и (опционально) checkpoint.pkl
+    Записи вытесняются по LRU, когда суммарный размер превышает max_size.
+    """
+
+    def __init__(self, root, max_size=None):
+        self.root = root
+        self.max_size = max_size  # в байтах, None – без ограничения
+        self.entries_dir = os.path.join(root, 'entries')
+        self.index_path = os.path.join(root, 'index.json')
+        self.lock_path = os.path.join(root, '.lock')
+        os.makedirs(self.entries_dir, exist_ok=True)
+
+    def key_for(self, config):
+        """Ключ кэша для эффективной конфигурации прогона."""
+        seed = config['model'].get('seed', 42)
+        return config_key(config, seed)
+
+    @contextmanager
+    def _locked(self):
+        """Эксклюзивная блокировка кэша между процессами."""
+        with open(self.lock_path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {'entries': {}, 'hits': 0, 'misses': 0, 'evictions': 0}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, index):
+        tmp = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp, self.index_path)
+
+    def get(self, key):
+        """Возвращает список метрик по ключу или None при промахе."""
+        with self._locked():
+            index = self._load_index()
+            entry = index['entries'].get(key)
+            path = os.path.join(self.entries_dir, key, 'metrics.json')
+            if entry is None or not os.path.exists(path):
+                index['misses'] += 1
+                self._save_index(index)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entry['last_access'] = time.time()
+            index['hits'] += 1
+            self._save_index(index)
+        return data
+
+    def get_or_run(self, configs, run):
+        """
+        Метрики прогонов конфигураций configs: из кэша, если он содержит их все,
+        иначе run() – список метрик в том же порядке – с записью недостающих в кэш.
+        """
+        keys = [self.key_for(config) for config in configs]
+        cached = [self.get(key) for key in keys]
+        if all(data is not None for data in cached):
+            return cached
+        results = run()
+        for key, data, hit in zip(keys, results, cached):
+            if hit is None:
+                self.put(key, data)
+        return results
+
+    def get_checkpoint(self, key):
+        """Возвращает сохранённый checkpoint или None."""
+        with self._locked():
+            path = os.path.join(self.entries_dir, key, 'checkpoint.pkl')
+            if not os.path.exists(path):
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+
+    def put(self, key, metrics, checkpoint=None):
+        """Сохраняет результаты прогона. Повторная запись того же ключа игнорируется."""
+        # Данные пишем во временный каталог вне блокировки, затем атомарно переименовываем
+        tmp_dir = os.path.join(self.root, f"tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            with open(os.path.join(tmp_dir, 'metrics.json'), 'w', encoding='utf-8') as f:
+                json.dump(metrics, f, default=_json_default)
+            if checkpoint is not None:
+                with open(os.path.join(tmp_dir, 'checkpoint.pkl'), 'wb') as f:
+                    pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = _dir_size(tmp_dir)
+
+            with self._locked():
+                index = self._load_index()
+                target = os.path.join(self.entries_dir, key)
+                if key in index['entries'] and os.path.exists(target):
+                    return  # другой процесс успел записать тот же результат
+                if os.path.exists(target):
+                    shutil.rmtree(target)
+                os.rename(tmp_dir, target)
+                now = time.time()
+                index['entries'][key] = {'size': size, 'created': now, 'last_access': now}
+                self._evict(index, keep=key)
+                self._save_index(index)
+        finally:
+            if os.path.exists(tmp_dir):
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _evict(self, index, keep=None):
+        """LRU-вытеснение до max_size. Вызывается под блокировкой."""
+        if self.max_size is None:
+            return
+        entries = index['entries']
+        total = sum(e['size'] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_access']):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            total -= entries[key]['size']
+            del entries[key]
+            shutil.rmtree(os.path.join(self.entries_dir, key), ignore_errors=True)
+            index['evictions'] += 1
+
+    def clear(self):
+        """Удаляет все записи (статистика сохраняется)."""
+        with self._locked():
+            index = self._load_index()
+            for key in list(index['entries']):
+                shutil.rmtree(os.path.join(self.entries_dir, key), ignore_errors=True)
+            index['entries'] = {}
+            self._save_index(index)
+
+    def stats(self):
+        """Статистика кэша."""
+        with self._locked():
+            index = self._load_index()
+        lookups = index['hits'] + index['misses']
+        return {
+            'entries': len(index['entries']),
+            'size_bytes': sum(e['size'] for e in index['entries'].values()),
+            'max_size_bytes': self.max_size,
+            'hits': index['hits'],
+            'misses': index['misses'],
+            'hit_rate': index['hits'] / lookups if lookups else 0.0,
+            'evictions': index['evictions'],
+        }
+
+    def format_stats(self):
+        """Текстовый отчёт по статистике кэша."""
+        s = self.stats()
+        limit = 'без ограничения' if s['max_size_bytes'] is None else f"{s['max_size_bytes'] / 2**20:.1f} МБ"
+        return (
+            f"Кэш результатов: {self.root}\n"
+            f"  записей: {s['entries']}, размер: {s['size_bytes'] / 2**20:.1f} МБ (лимит: {limit})\n"
+            f"  попаданий: {s['hits']}, промахов: {s['misses']}, hit rate: {s['hit_rate']:.1%}\n"
+            f"  вытеснено: {s['evictions']}"
+        )
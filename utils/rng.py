@@ -0,0 +1,143 @@
+import zlib
+import numpy as np
+
+_STRATA_TAG = 0x5354524154  # отдельная ветка seed для перестановок страт
+_MANTISSA = 2 ** 53
+
+# Коэффициенты рационального приближения обратной функции нормального распределения (Acklam)
+_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+      6.680131188771972e+01, -1.328068155288572e+01)
+_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+      -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+      3.754408661907416e+00)
+_P_LOW = 0.02425
+
+
+def component_key(component):
+    """Стабильный целочисленный ключ компонента (не зависит от PYTHONHASHSEED)."""
+    return zlib.crc32(component.encode('utf-8'))
+
+
+def norm_ppf(u):
+    """Обратная функция стандартного нормального распределения (векторно)."""
+    u = np.asarray(u, dtype=float)
+    z = np.empty_like(u)
+    low = u < _P_LOW
+    high = u > 1 - _P_LOW
+    mid = ~(low | high)
+
+    q = u[mid] - 0.5
+    r = q * q
+    z[mid] = (((((_A[0] * r + _A[1]) * r + _A[2]) * r + _A[3]) * r + _A[4]) * r + _A[5]) * q / \
+             (((((_B[0] * r + _B[1]) * r + _B[2]) * r + _B[3]) * r + _B[4]) * r + 1)
+
+    for mask, sign, p in ((low, 1.0, u[low]), (high, -1.0, 1 - u[high])):
+        q = np.sqrt(-2 * np.log(p))
+        z[mask] = sign * (((((_C[0] * q + _C[1]) * q + _C[2]) * q + _C[3]) * q + _C[4]) * q + _C[5]) / \
+                  ((((_D[0] * q + _D[1]) * q + _D[2]) * q + _D[3]) * q + 1)
+    return z
+
+
+class RandomStream:
+    """
+    Поток случайных чисел одного компонента модели.
+
+    Все распределения строятся из равномерных величин обратным преобразованием,
+    поэтому один и тот же seed даёт одинаковые розыгрыши в базовом и тестовом
+    прогоне (общие случайные числа), antithetic=True заменяет u на 1 - u,
+    а stratum=(r, R) помещает i-й розыгрыш реплики r в страту perm_i[r] из R
+    (латинский гиперкуб по репликам).
+    """
+
+    def __init__(self, seed, component, antithetic=False, stratum=None):
+        key = component_key(component)
+        self._gen = np.random.default_rng([seed, key])
+        self.antithetic = antithetic
+        self.stratum = stratum
+        if stratum is not None:
+            # Перестановки страт общие для всех реплик, поэтому не зависят от r
+            self._strata_gen = np.random.default_rng([seed, key, _STRATA_TAG])
+
+    def uniform(self, size=None):
+        """Равномерные величины из (0, 1)."""
+        n = 1 if size is None else int(np.prod(size))
+        # Центр ячейки сетки 2^-53: симметрично относительно 1 - u и не попадает в 0 и 1
+        u = (np.floor(self._gen.random(n) * _MANTISSA) + 0.5) / _MANTISSA
+        if self.stratum is not None:
+            r, count = self.stratum
+            strata = np.argsort(self._strata_gen.random((n, count)), axis=1)[:, r]
+            u = (strata + u) / count
+        if self.antithetic:
+            u = 1 - u
+        return u[0] if size is None else u.reshape(size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        return loc + scale * norm_ppf(self.uniform(size))
+
+    def lognormal(self, mean=0.0, sigma=1.0, size=None):
+        return np.exp(self.normal(mean, sigma, size))
+
+    def integers(self, low, high, size=None):
+        """Целые из [low, high)."""
+        u = self.uniform(size)
+        return np.minimum(low + np.floor(u * (high - low)).astype(np.int64), high - 1)
+
+    def choice(self, options, p, size=None):
+        """Выбор из options с вероятностями p."""
+        cdf = np.cumsum(p, dtype=float)
+        idx = np.searchsorted(cdf / cdf[-1], self.uniform(size), side='right')
+        return np.asarray(options)[np.minimum(idx, len(options) - 1)]
+
+    def categorical(self, p, size=None):
+        """Индексы категорий с вероятностями p."""
+        return self.choice(np.arange(len(p)), p, size)
+
+    def poisson(self, lam, size=None):
+        """Пуассоновские величины обратным преобразованием (для небольших lam)."""
+        u = np.atleast_1d(self.uniform(size))
+        k = np.zeros(u.shape, dtype=np.int64)
+        term = np.exp(-lam)
+        cdf = term
+        active = u > cdf
+        i = 0
+        while active.any() and term > 0:
+            i += 1
+            term = term * lam / i
+            cdf = cdf + term
+            k[active] += 1
+            active = u > cdf
+        return k[0] if size is None else k
+
+    def multinomial(self, n, pvals):
+        """Число попаданий в каждую категорию при n независимых испытаниях."""
+        return np.bincount(self.categorical(pvals, n), minlength=len(pvals))
+
+
+class RandomStreams:
+    """
+    Независимые потоки случайных чисел по компонентам модели.
+
+    Поток компонента зависит только от seed и имени компонента, поэтому изменение
+    числа розыгрышей в одном компоненте не сдвигает розыгрыши в других.
+    Настройки берутся из раздела конфигурации 'random':
+        antithetic: true/false
+        stratum: [r, R]
+    """
+
+    def __init__(self, seed, config=None):
+        config = config or {}
+        self.seed = seed
+        self.antithetic = config.get('antithetic', False)
+        stratum = config.get('stratum')
+        self.stratum = tuple(stratum) if stratum is not None else None
+        self._streams = {}
+
+    def stream(self, component):
+        s = self._streams.get(component)
+        if s is None:
+            s = RandomStream(self.seed, component, self.antithetic, self.stratum)
+            self._streams[component] = s
+        return s